@@ -1,5 +1,15 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
 
+# Google Drive sync is optional and its client libraries are imported lazily
+# (core/drive_sync.py). Build without them for a smaller bundle:
+#   IRONVAULT_NO_DRIVE=1 pyinstaller IronVault.spec --clean --noconfirm
+DRIVE_EXCLUDES = [
+    'googleapiclient', 'google_auth_oauthlib', 'google_auth_httplib2',
+    'google.auth', 'google.oauth2', 'google.api_core', 'googleapis_common_protos',
+    'httplib2', 'oauthlib', 'requests_oauthlib', 'uritemplate',
+]
+excludes = DRIVE_EXCLUDES if os.environ.get('IRONVAULT_NO_DRIVE') == '1' else []
 
 a = Analysis(
     ['main.py'],
@@ -10,7 +20,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=excludes,
     noarchive=False,
     optimize=0,
 )
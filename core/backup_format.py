@@ -0,0 +1,124 @@
+import struct
+import secrets
+from cryptography.exceptions import InvalidTag
+from core.security import VaultCipher
+
+class BackupFormat:
+    """
+    Chunked, streaming AES-GCM format of vault.enc, so backup and restore run in
+    constant memory whatever the size of the vault.
+
+    Layout:
+        header   MAGIC (4) | version (1) | chunk size (4) | nonce prefix (7)
+        segments length (4) | AES-GCM(chunk), repeated
+
+    Each segment's nonce is nonce prefix (7) | counter (4) | last flag (1) and the
+    header is authenticated with every segment, so segments cannot be reordered,
+    dropped or moved between files. The last segment (possibly empty) has the
+    flag set and acts as the authenticated trailer: a truncated file fails.
+
+    The legacy format is a single message, nonce (12) | ciphertext, read by decrypt_legacy.
+    """
+    MAGIC = b"IVBK"
+    VERSION = 1
+    CHUNK_SIZE = 1024 * 1024
+    NONCE_PREFIX_SIZE = 7
+    TAG_SIZE = 16
+
+    _header = struct.Struct(">4sBI7s")
+    _length = struct.Struct(">I")
+
+    @classmethod
+    def is_chunked(cls, path) -> bool:
+        """True if the file at path starts with the chunked format header."""
+        with open(path, 'rb') as f:
+            return f.read(len(cls.MAGIC)) == cls.MAGIC
+
+    @staticmethod
+    def _nonce(prefix, counter, last):
+        return prefix + struct.pack(">IB", counter, 1 if last else 0)
+
+    @classmethod
+    def encrypt_stream(cls, encryption_key, src, dst, chunk_size=None) -> int:
+        """
+        Encrypts the binary stream src into dst, chunk by chunk.
+        Returns the number of plaintext bytes written.
+        """
+        aesgcm = VaultCipher.of(encryption_key).aesgcm
+        chunk_size = chunk_size or cls.CHUNK_SIZE
+        prefix = secrets.token_bytes(cls.NONCE_PREFIX_SIZE)
+        header = cls._header.pack(cls.MAGIC, cls.VERSION, chunk_size, prefix)
+        dst.write(header)
+
+        total = 0
+        counter = 0
+        chunk = src.read(chunk_size)
+        while True:
+            # Read one chunk ahead to know whether this one is the last
+            next_chunk = src.read(chunk_size) if chunk else b""
+            last = not next_chunk
+            segment = aesgcm.encrypt(cls._nonce(prefix, counter, last), chunk, header)
+            dst.write(cls._length.pack(len(segment)))
+            dst.write(segment)
+            total += len(chunk)
+            if last:
+                return total
+            counter += 1
+            chunk = next_chunk
+
+    @classmethod
+    def decrypt_stream(cls, encryption_key, src, dst) -> int:
+        """
+        Decrypts a chunked backup from src into dst.
+        Raises ValueError if the file is not in this format, truncated or tampered with.
+        dst may hold partial plaintext on failure, write it to a temporary file.
+        Returns the number of plaintext bytes written.
+        """
+        aesgcm = VaultCipher.of(encryption_key).aesgcm
+        header = src.read(cls._header.size)
+        if len(header) != cls._header.size:
+            raise ValueError("Backup file is truncated.")
+        magic, version, chunk_size, prefix = cls._header.unpack(header)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a chunked backup file.")
+        if version != cls.VERSION:
+            raise ValueError(f"Unsupported backup format version {version}.")
+
+        total = 0
+        counter = 0
+        while True:
+            length_bytes = src.read(cls._length.size)
+            if len(length_bytes) != cls._length.size:
+                raise ValueError("Backup file is truncated.")
+            (length,) = cls._length.unpack(length_bytes)
+            if length < cls.TAG_SIZE or length > chunk_size + cls.TAG_SIZE:
+                raise ValueError("Backup file is corrupted.")
+            segment = src.read(length)
+            if len(segment) != length:
+                raise ValueError("Backup file is truncated.")
+
+            # Try as a regular segment first, then as the final one
+            try:
+                chunk = aesgcm.decrypt(cls._nonce(prefix, counter, False), segment, header)
+                last = False
+            except InvalidTag:
+                try:
+                    chunk = aesgcm.decrypt(cls._nonce(prefix, counter, True), segment, header)
+                    last = True
+                except InvalidTag:
+                    raise ValueError("Backup file is corrupted or the key is wrong.")
+
+            dst.write(chunk)
+            total += len(chunk)
+            if last:
+                if src.read(1):
+                    raise ValueError("Unexpected data after the end of the backup.")
+                return total
+            counter += 1
+
+    @staticmethod
+    def decrypt_legacy(encryption_key, blob) -> bytes:
+        """Decrypts the old single-message format: nonce (12) | ciphertext."""
+        nonce = blob[:12]
+        ciphertext = blob[12:]
+        return VaultCipher.of(encryption_key).decrypt_bytes(nonce, ciphertext)
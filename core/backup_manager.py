@@ -1,13 +1,65 @@
-
 import os
+import json
+import base64
 import shutil
+import sqlite3
+import tempfile
 import time
-from core.security import SecurityManager
+import uuid
+from core.security import VaultCipher
+from core.backup_format import BackupFormat
+from core.merge import VaultMerger
+from core.storage import LocalStorage
+from database.db_manager import DBManager
 
 class BackupManager:
-    def __init__(self, config_file="backup_config.json"):
+    # Incremental backups: vault.enc is a full snapshot at base_revision, each
+    # auto-sync adds a small encrypted delta with the entries changed since the
+    # previous one. The manifest lists them; restore applies them in order.
+    # The manifest also names the vault copy that wrote the snapshot (vault_id)
+    # and the snapshot itself (base_id, kept in that vault's metadata as
+    # backup_base_id): deltas are only added by that copy on top of that
+    # snapshot, anything else (another device sharing the folder) writes a full backup.
+    MANIFEST_FILE = "vault.manifest.json"
+    # Compact (write a new full snapshot) after this many deltas, or once the
+    # deltas together are larger than this share of the snapshot
+    COMPACT_AFTER = 50
+    COMPACT_RATIO = 0.5
+
+    # Every full backup is also kept as a timestamped version in versions/,
+    # described by an encrypted index (listing them needs no decryption of the
+    # backups themselves). Retention: the last KEEP_LAST versions, plus the
+    # newest of each of the last KEEP_DAILY days and KEEP_WEEKLY weeks.
+    VERSIONS_DIR = "versions"
+    VERSION_INDEX_FILE = "index.enc"
+    KEEP_LAST = 10
+    KEEP_DAILY = 7
+    KEEP_WEEKLY = 4
+    # Files of the backup set that come and go: copies of it (mirror) delete the
+    # ones gone from the backup folder
+    PRUNED_PREFIXES = ("vault.delta.", VERSIONS_DIR + "/")
+    # Local safety copies made before a restore (vault.db.<timestamp>.bak)
+    KEEP_SAFETY_COPIES = 3
+
+    # Backups are written through a StorageBackend (core/storage.py): the local
+    # backup folder by default, or the backend given to __init__ (Drive, in-memory).
+    def __init__(self, config_file="backup_config.json", storage=None):
         self.config_file = config_file
         self.backup_path = self._load_path()
+        self._storage = storage
+
+    @property
+    def storage(self):
+        """Backend holding the backups, None if no backup folder is set."""
+        if self._storage is not None:
+            return self._storage
+        if self.backup_path:
+            return LocalStorage(self.backup_path)
+        return None
+
+    def _storage_ready(self):
+        storage = self.storage
+        return storage is not None and storage.is_available()
 
     def _load_path(self):
         if os.path.exists(self.config_file):
@@ -26,63 +78,409 @@ class BackupManager:
         with open(self.config_file, 'w') as f:
             json.dump({'backup_path': path}, f)
 
+    def _load_manifest(self):
+        try:
+            return json.loads(self.storage.get_bytes(self.MANIFEST_FILE))
+        except (OSError, ValueError):
+            return None
+
+    def _save_manifest(self, manifest):
+        self.storage.put_bytes(self.MANIFEST_FILE, json.dumps(manifest).encode())
+
+    def _remove_deltas(self):
+        for file in self.storage.list("vault.delta."):
+            if file['name'].endswith(".enc"):
+                self.storage.delete(file['name'])
+
+    def backup_files(self) -> list:
+        """Names of the files making up the backup set (what gets copied to another storage)."""
+        if not self._storage_ready():
+            return []
+        # Only the encrypted set: never a legacy plaintext vault.db (or its -wal/-shm)
+        names = [name for name in ("vault.enc", self.MANIFEST_FILE) if self.storage.exists(name)]
+        names += [f['name'] for f in self.storage.list("vault.delta.") if f['name'].endswith(".enc")]
+        names += [f['name'] for f in self.storage.list(self.VERSIONS_DIR + "/")]
+        return names
+
+    @staticmethod
+    def _revision_of(db_path):
+        """Change log revision stored in a database file (0 for vaults without one)."""
+        conn = sqlite3.connect(db_path)
+        try:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name='changelog'").fetchone()
+            return row[0] if row else 0
+        except sqlite3.OperationalError:
+            return 0
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _fingerprint_of(db_path):
+        """DBManager.content_fingerprint of a database file (see backup manifest)."""
+        db = DBManager(db_path, read_only=True)
+        try:
+            return db.content_fingerprint()
+        finally:
+            db.conn.close()
+
+    @staticmethod
+    def _owns_manifest(manifest, db):
+        """True if the snapshot described by manifest was written by this vault copy (db)."""
+        base_id = manifest.get('base_id')
+        return base_id is not None and base_id == db.get_meta('backup_base_id') \
+            and manifest.get('vault_id') == db.get_meta('vault_id')
+
+    @staticmethod
+    def _delta_aad(from_revision, to_revision):
+        # Binds each delta to its place in the chain
+        return f"IronVault delta {from_revision}-{to_revision}".encode()
+
+    @staticmethod
+    def _temp_file(db_path, suffix):
+        """New empty temp file next to db_path (same disk), unique so concurrent backups never share one."""
+        fd, path = tempfile.mkstemp(prefix=os.path.basename(db_path) + ".", suffix=suffix,
+                                    dir=os.path.dirname(os.path.abspath(db_path)))
+        os.close(fd)
+        return path
+
+    @staticmethod
+    def snapshot_db(db_path, target_path, pages_per_step=256):
+        """
+        Copies a consistent image of the live database into target_path with the
+        SQLite online backup API. The copy runs pages_per_step pages at a time, so
+        writers on other connections are never paused for long; committed WAL
+        content is included, uncommitted changes are not.
+        """
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(db_path)
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(target_path)
+        try:
+            source.execute("PRAGMA busy_timeout=5000")
+            source.backup(target, pages=pages_per_step, sleep=0.001)
+            # Standalone file: no -wal companion needed to read it
+            target.execute("PRAGMA journal_mode=DELETE").fetchone()
+        finally:
+            target.close()
+            source.close()
+
     def backup_db(self, db_path="vault.db", encryption_key=None):
-        if not self.backup_path or not os.path.exists(self.backup_path):
+        if not self._storage_ready():
             return False, "Backup folder not selected or invalid."
         
+        storage = self.storage
         try:
-            target_file = os.path.join(self.backup_path, "vault.enc")
-            
-            with open(db_path, 'rb') as f:
-                data = f.read()
-                
-            if encryption_key:
-                # Encrypt the entire file
-                # We can reuse SecurityManager.encrypt? 
-                # SecurityManager.encrypt returns (nonce, ciphertext) in base64 usually or tuple.
-                # Let's check SecurityManager.
-                # For file encryption, we want a single blob.
-                # Let's assume we can use the same logic but serialize the nonce+ciphertext.
-                # Actually, SecurityManager.encrypt takes (data, key) -> (nonce, ciphertext).
-                
-                # We need to construct a robust format: [NONCE (16 bytes)][CIPHERTEXT]
-                from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-                
-                # We assume generic key is 32 bytes.
-                aesgcm = AESGCM(encryption_key)
-                nonce = os.urandom(12)
-                ciphertext = aesgcm.encrypt(nonce, data, None)
-                
-                encrypted_blob = nonce + ciphertext
+            # Nothing changed since the last backup: skip snapshot, encryption and write
+            manifest = self._load_manifest()
+            if encryption_key and manifest and not manifest['deltas'] and storage.exists("vault.enc"):
+                db = DBManager(db_path, read_only=True)
+                try:
+                    current = self._owns_manifest(manifest, db) and manifest.get('fingerprint') == db.content_fingerprint()
+                finally:
+                    db.conn.close()
+                if current:
+                    return True, "Backup is up to date."
+
+            # Encrypt a consistent snapshot, not the live file (which may be
+            # mid-write or have commits still in the WAL)
+            snapshot_file = self._temp_file(db_path, ".snapshot")
+            encrypted_file = self._temp_file(db_path, ".snapshot.enc")
+            try:
+                self.snapshot_db(db_path, snapshot_file)
                 
-                with open(target_file, 'wb') as f_out:
-                    f_out.write(encrypted_blob)
-                    
-                return True, f"Encrypted and backed up to {target_file}"
-            else:
-                # Fallback to plain copy if no key (shouldn't happen with our logic)
-                target_file = os.path.join(self.backup_path, "vault.db")
-                shutil.copy2(db_path, target_file)
-                return True, f"Backed up (Unencrypted) to {target_file}"
+                if encryption_key:
+                    # Streamed chunk by chunk (see BackupFormat), memory use does not
+                    # grow with the vault. The storage replaces vault.enc only once
+                    # it is fully written, an interrupted backup keeps the previous one.
+                    with open(snapshot_file, 'rb') as f_in, open(encrypted_file, 'wb') as f_out:
+                        BackupFormat.encrypt_stream(encryption_key, f_in, f_out)
+                    storage.put_file("vault.enc", encrypted_file)
+
+                    # New base for incremental backups: older deltas are now part of the snapshot
+                    fingerprint = self._fingerprint_of(snapshot_file)
+                    revision = fingerprint['revision']
+                    base_id = str(uuid.uuid4())
+                    db = DBManager(db_path)
+                    try:
+                        self._save_manifest({"vault_id": db.get_meta('vault_id'), "base_id": base_id,
+                                             "base_revision": revision, "deltas": [], "fingerprint": fingerprint})
+                        self._remove_deltas()
+                        with db.transaction():
+                            db.prune_changelog(revision)
+                            db.set_meta('backup_base_id', base_id)
+                    finally:
+                        db.conn.close()
+
+                    self._add_version(encrypted_file, snapshot_file, revision, encryption_key)
+                        
+                    return True, f"Encrypted and backed up to {storage.location('vault.enc')}"
+                else:
+                    # Fallback to plain copy if no key (shouldn't happen with our logic)
+                    storage.put_file("vault.db", snapshot_file)
+                    return True, f"Backed up (Unencrypted) to {storage.location('vault.db')}"
+            finally:
+                for path in (snapshot_file, encrypted_file):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+        except Exception as e:
+            return False, f"Backup failed: {e}"
+
+    # --- Versions ---
+
+    def _version_name(self, file_name):
+        return f"{self.VERSIONS_DIR}/{file_name}"
+
+    def _load_version_index(self, encryption_key):
+        try:
+            blob = self.storage.get_bytes(self._version_name(self.VERSION_INDEX_FILE))
+        except FileNotFoundError:
+            return []
+        payload = VaultCipher.of(encryption_key).decrypt_bytes(blob[:12], blob[12:], b"IronVault backup index")
+        return json.loads(payload)
+
+    def _save_version_index(self, versions, encryption_key):
+        payload = json.dumps(versions).encode()
+        nonce, ciphertext = VaultCipher.of(encryption_key).encrypt_bytes(payload, b"IronVault backup index")
+        self.storage.put_bytes(self._version_name(self.VERSION_INDEX_FILE), nonce + ciphertext)
+
+    def _add_version(self, backup_file, snapshot_file, revision, encryption_key):
+        """Keeps a copy of a new full backup (local file backup_file) as a version, then applies the retention policy."""
+        created = time.time()
+        name = time.strftime("vault-%Y%m%d-%H%M%S.enc", time.localtime(created))
+        self.storage.put_file(self._version_name(name), backup_file)
+
+        conn = sqlite3.connect(snapshot_file)
+        try:
+            entry_count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        finally:
+            conn.close()
+
+        try:
+            versions = self._load_version_index(encryption_key)
+        except Exception as e:
+            # Unreadable index (e.g. written with another key): start a new one
+            print(f"Backup: version index unreadable, recreating it: {e}")
+            versions = []
+        versions = [v for v in versions if v['file'] != name]
+        versions.append({"file": name, "created": created, "revision": revision,
+                         "entries": entry_count, "size": os.path.getsize(backup_file)})
+
+        keep = self._retained(versions)
+        for version in versions:
+            if version['file'] not in keep:
+                self.storage.delete(self._version_name(version['file']))
+        versions = [v for v in versions if v['file'] in keep]
+        self._save_version_index(versions, encryption_key)
+
+    @classmethod
+    def _retained(cls, versions):
+        """File names kept by the retention policy (last N, daily and weekly rollups)."""
+        newest_first = sorted(versions, key=lambda v: v['created'], reverse=True)
+        keep = {v['file'] for v in newest_first[:cls.KEEP_LAST]}
+        days = {}
+        weeks = {}
+        for version in newest_first:
+            created = time.localtime(version['created'])
+            days.setdefault(time.strftime("%Y-%m-%d", created), version['file'])
+            weeks.setdefault(time.strftime("%G-%V", created), version['file'])
+        keep.update(list(days.values())[:cls.KEEP_DAILY])
+        keep.update(list(weeks.values())[:cls.KEEP_WEEKLY])
+        return keep
 
+    def list_versions(self, encryption_key):
+        """
+        Returns the restore points, newest first: dicts with file, created
+        (epoch seconds), revision, entries and size. Only the index is decrypted.
+        """
+        if not self._storage_ready() or not encryption_key:
+            return []
+        try:
+            versions = self._load_version_index(encryption_key)
+        except Exception as e:
+            print(f"Backup: cannot read version index: {e}")
+            return []
+        return sorted(versions, key=lambda v: v['created'], reverse=True)
+
+    def _safety_copy(self, db_path):
+        """Copies the local vault to a timestamped .bak before a restore, keeping the last few."""
+        if not os.path.exists(db_path):
+            return
+        # Empty the WAL first, its frames would otherwise be replayed over the restored file
+        DBManager.checkpoint_file(db_path)
+        shutil.copy2(db_path, f"{db_path}.{time.strftime('%Y%m%d-%H%M%S')}.bak")
+
+        folder = os.path.dirname(os.path.abspath(db_path))
+        prefix = os.path.basename(db_path) + "."
+        copies = sorted(name for name in os.listdir(folder)
+                        if name.startswith(prefix) and name.endswith(".bak"))
+        for name in copies[:-self.KEEP_SAFETY_COPIES]:
+            os.remove(os.path.join(folder, name))
+
+    def backup_incremental(self, db_path="vault.db", encryption_key=None):
+        """
+        Writes only the entries changed since the last backup as an encrypted delta
+        file, so the cost follows the size of the change, not of the vault.
+        Falls back to a full backup_db when there is no usable base snapshot
+        (missing, or written by another vault copy), the change log does not
+        reach back far enough, or it is time to compact.
+        """
+        if not self._storage_ready():
+            return False, "Backup folder not selected or invalid."
+        if not encryption_key:
+            return self.backup_db(db_path, encryption_key)
+
+        manifest = self._load_manifest()
+        base = self.storage.stat("vault.enc")
+        if manifest is None or base is None:
+            return self.backup_db(db_path, encryption_key)
+
+        deltas = manifest['deltas']
+        delta_size = sum(delta.get('size', 0) for delta in deltas)
+        if len(deltas) >= self.COMPACT_AFTER or delta_size > base['size'] * self.COMPACT_RATIO:
+            print("Backup: compacting deltas into a full snapshot...")
+            return self.backup_db(db_path, encryption_key)
+
+        try:
+            since = deltas[-1]['to'] if deltas else manifest['base_revision']
+            db = DBManager(db_path)
+            try:
+                fingerprint = db.content_fingerprint()
+                # Snapshot written by another device, pruned past our last delta, or the local
+                # vault was replaced (restore). Deltas only carry entries: a metadata change
+                # (e.g. new master password) needs a full backup.
+                usable = self._owns_manifest(manifest, db) \
+                    and db.changelog_start() <= since <= fingerprint['revision'] \
+                    and fingerprint['metadata'] == manifest.get('fingerprint', {}).get('metadata')
+                if usable:
+                    latest, changes = db.get_changes_since(since)
+            finally:
+                db.conn.close()
+            if not usable:
+                return self.backup_db(db_path, encryption_key)
+            if not changes:
+                return True, "Backup is up to date."
+
+            for change in changes:
+                if not change.get("deleted"):
+                    change['ciphertext'] = base64.b64encode(change['ciphertext']).decode()
+                    change['nonce'] = base64.b64encode(change['nonce']).decode()
+            payload = json.dumps({"from": since, "to": latest, "changes": changes}).encode()
+            nonce, ciphertext = VaultCipher.of(encryption_key).encrypt_bytes(payload, self._delta_aad(since, latest))
+
+            delta_name = f"vault.delta.{latest:010d}.enc"
+            self.storage.put_bytes(delta_name, nonce + ciphertext)
+
+            deltas.append({"file": delta_name, "from": since, "to": latest, "size": len(nonce) + len(ciphertext)})
+            manifest['fingerprint']['revision'] = latest
+            self._save_manifest(manifest)
+            return True, f"Incremental backup: {len(changes)} changed entries written to {self.storage.location(delta_name)}"
         except Exception as e:
             return False, f"Backup failed: {e}"
 
-    def restore_db(self, target_db_path="vault.db", encryption_key=None):
-        if not self.backup_path or not os.path.exists(self.backup_path):
+    def _apply_deltas(self, db_path, encryption_key):
+        """Applies the deltas listed in the manifest on top of a restored snapshot. Returns their count."""
+        manifest = self._load_manifest()
+        if not manifest or not manifest['deltas']:
+            return 0
+        revision = self._revision_of(db_path)
+        if revision != manifest['base_revision']:
+            print(f"Restore: snapshot is at revision {revision}, deltas start at {manifest['base_revision']}. Skipping them.")
+            return 0
+
+        cipher = VaultCipher.of(encryption_key)
+        db = DBManager(db_path, profile="legacy")
+        try:
+            for delta in manifest['deltas']:
+                blob = self.storage.get_bytes(delta['file'])
+                payload = cipher.decrypt_bytes(blob[:12], blob[12:], self._delta_aad(delta['from'], delta['to']))
+                changes = json.loads(payload)['changes']
+                for change in changes:
+                    if not change.get("deleted"):
+                        change['ciphertext'] = base64.b64decode(change['ciphertext'])
+                        change['nonce'] = base64.b64decode(change['nonce'])
+                db.apply_changes(changes)
+        finally:
+            db.conn.close()
+        return len(manifest['deltas'])
+
+    def _decrypt_backup(self, name, target_file, encryption_key):
+        """Fetches the backup file name from the storage and decrypts it (chunked or legacy format) into target_file."""
+        encrypted_file = target_file + ".enc"
+        try:
+            self.storage.get_file(name, encrypted_file)
+            if BackupFormat.is_chunked(encrypted_file):
+                with open(encrypted_file, 'rb') as f_in, open(target_file, 'wb') as f_out:
+                    BackupFormat.decrypt_stream(encryption_key, f_in, f_out)
+            else:
+                # Legacy single-blob backup: [NONCE (12 bytes)][CIPHERTEXT]
+                with open(encrypted_file, 'rb') as f_in:
+                    plaintext = BackupFormat.decrypt_legacy(encryption_key, f_in.read())
+                with open(target_file, 'wb') as f_out:
+                    f_out.write(plaintext)
+        finally:
+            if os.path.exists(encrypted_file):
+                os.remove(encrypted_file)
+
+    def merge_db(self, db_path="vault.db", encryption_key=None, strategy="conflict_copy", local_db=None):
+        """
+        Merges the latest backup into the local vault entry by entry (see VaultMerger)
+        instead of overwriting it, so changes made on both devices are kept.
+        local_db: an open DBManager on db_path to write through (e.g. the vault
+        worker's), a new connection is used if None.
+        """
+        if not self._storage_ready():
+            return False, "Backup folder not selected or invalid."
+        if not encryption_key:
+            return False, "Encryption key required for merge."
+        if not self.storage.exists("vault.enc"):
+            return False, "No 'vault.enc' found in backup folder."
+
+        temp_file = self._temp_file(db_path, ".merge")
+        try:
+            self._decrypt_backup("vault.enc", temp_file, encryption_key)
+            self._apply_deltas(temp_file, encryption_key)
+
+            remote_db = DBManager(temp_file, read_only=True)
+            own_connection = local_db is None
+            if own_connection:
+                local_db = DBManager(db_path)
+            try:
+                counts = VaultMerger(local_db, strategy).merge(remote_db)
+            finally:
+                remote_db.conn.close()
+                if own_connection:
+                    local_db.conn.close()
+            return True, ("Merged: {added} added, {updated} updated, {deleted} deleted, "
+                          "{conflicts} conflicts.".format(**counts))
+        except Exception as e:
+            return False, f"Merge failed: {e}"
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+    def restore_db(self, target_db_path="vault.db", encryption_key=None, version=None):
+        """
+        Restores the latest backup (vault.enc plus its incremental deltas), or the
+        restore point named version (a file from list_versions).
+        """
+        if not self._storage_ready():
             return False, "Backup folder not selected or invalid."
         
-        source_file = os.path.join(self.backup_path, "vault.enc")
+        storage = self.storage
+        source_name = "vault.enc"
+        if version:
+            source_name = self._version_name(os.path.basename(version))
+            if not storage.exists(source_name):
+                return False, f"Restore point '{version}' not found."
         
         # Check for legacy unencrypted file
-        if not os.path.exists(source_file):
-            legacy_file = os.path.join(self.backup_path, "vault.db")
-            if os.path.exists(legacy_file):
+        if not storage.exists(source_name):
+            if storage.exists("vault.db"):
                 # Restore plain
                 try:
-                    if os.path.exists(target_db_path):
-                        shutil.copy2(target_db_path, target_db_path + ".bak")
-                    shutil.copy2(legacy_file, target_db_path)
+                    self._safety_copy(target_db_path)
+                    storage.get_file("vault.db", target_db_path)
                     return True, "Restored (Unencrypted Legacy) successfully."
                 except Exception as e:
                     return False, f"Restore failed: {e}"
@@ -90,24 +488,35 @@ class BackupManager:
             
         try:
             # Create safety backup of current local
-            if os.path.exists(target_db_path):
-                shutil.copy2(target_db_path, target_db_path + ".bak") 
+            self._safety_copy(target_db_path)
             
-            with open(source_file, 'rb') as f_in:
-                encrypted_blob = f_in.read()
-                
             if encryption_key:
-                from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-                aesgcm = AESGCM(encryption_key)
-                
-                nonce = encrypted_blob[:12]
-                ciphertext = encrypted_blob[12:]
-                
-                plaintext = aesgcm.decrypt(nonce, ciphertext, None)
-                
-                with open(target_db_path, 'wb') as f_out:
-                    f_out.write(plaintext)
+                # Decrypted next to the target and swapped in only once fully authenticated
+                temp_file = target_db_path + ".restore"
+                try:
+                    self._decrypt_backup(source_name, temp_file, encryption_key)
+                    # Deltas follow vault.enc only, a version is restored as it was
+                    applied = 0 if version else self._apply_deltas(temp_file, encryption_key)
+                    try:
+                        os.replace(temp_file, target_db_path)
+                    except PermissionError:
+                        # Windows: the file is still held (e.g. by a virus scanner), overwrite it in place
+                        shutil.copyfile(temp_file, target_db_path)
+                finally:
+                    if os.path.exists(temp_file):
+                        os.remove(temp_file)
+
+                # The restored file is a new copy of the vault: its own identity, and since its
+                # revisions no longer follow the backup's, the next backup is a full one
+                # (_owns_manifest). The manifest stays, other devices still need its deltas.
+                db = DBManager(target_db_path)
+                try:
+                    db.reset_vault_id()
+                finally:
+                    db.conn.close()
                     
+                if applied:
+                    return True, f"Restored and Decrypted successfully ({applied} incremental backups applied)."
                 return True, "Restored and Decrypted successfully."
             else:
                  return False, "Encryption key required for restore."
@@ -116,9 +525,7 @@ class BackupManager:
             return False, f"Restore failed: {e}"
 
     def get_last_modified_remote(self):
-        if not self.backup_path:
+        if not self._storage_ready():
             return 0
-        source_file = os.path.join(self.backup_path, "vault.enc")
-        if os.path.exists(source_file):
-            return os.path.getmtime(source_file)
-        return 0
+        base = self.storage.stat("vault.enc")
+        return base['modified'] if base else 0
@@ -0,0 +1,48 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class CryptoPool:
+    """
+    Thread pool for bulk encrypt/decrypt work (export, import, re-key).
+    AESGCM from `cryptography` releases the GIL while it runs,
+    so batches of entries can be processed on several cores.
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    # Below this many items the work runs inline, a thread hop would cost more than it saves
+    MIN_PARALLEL_ITEMS = 64
+
+    def __init__(self, max_workers=None, batch_size=256):
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="IronVaultCrypto")
+
+    @classmethod
+    def shared(cls):
+        """Returns the process wide pool, created on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def map_batches(self, func, items) -> list:
+        """
+        Splits items into batches, runs func(batch) -> list on the pool
+        and returns the concatenated results in input order.
+        """
+        items = list(items)
+        if len(items) < self.MIN_PARALLEL_ITEMS or self.max_workers == 1:
+            return func(items)
+
+        # At least one batch per worker so every core gets work
+        batch_size = max(1, min(self.batch_size, -(-len(items) // self.max_workers)))
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        results = []
+        for batch_result in self._executor.map(func, batches):
+            results.extend(batch_result)
+        return results
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
@@ -2,24 +2,79 @@
 import os
 import pickle
 import json
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
-import io
+import hashlib
+import importlib.util
+import random
+import time
+
+# The Google client libraries are imported on first use (see load_client): they
+# are among the heaviest imports of the app and only needed once Drive sync is set up.
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
 
+def drive_available() -> bool:
+    """True if the Google client libraries are installed (checked without importing them)."""
+    return all(importlib.util.find_spec(name) is not None
+               for name in ("googleapiclient", "google_auth_oauthlib"))
+
+def is_configured(credentials_file='credentials.json') -> bool:
+    """True if Drive sync is set up: client libraries installed and credentials.json present."""
+    return os.path.exists(credentials_file) and drive_available()
+
 class DriveSyncManager:
-    def __init__(self, credentials_file='credentials.json', token_file='token.json'):
+    # Upload chunk size, must be a multiple of 256 KiB for Drive
+    CHUNK_SIZE = 4 * 1024 * 1024
+    # Retries (randomized exponential backoff, done by googleapiclient) on
+    # 5xx and rate limit responses (429, 403 rateLimitExceeded)
+    NUM_RETRIES = 5
+
+    def __init__(self, credentials_file='credentials.json', token_file='token.json',
+                 cache_file='drive_cache.json', service=None):
+        """
+        service can be given directly (e.g. tests/fake_drive.py) instead of
+        going through authenticate().
+        """
         self.creds = None
-        self.service = None
+        self.service = service
         self.credentials_file = credentials_file
         self.token_file = token_file
+        # file name -> {"id", "md5", "modifiedTime", "pending": {"uri", "md5"}}
+        self.cache_file = cache_file
+        self.cache = self._load_cache()
+
+    def _load_cache(self):
+        if self.cache_file and os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def _save_cache(self):
+        if not self.cache_file:
+            return
+        with open(self.cache_file + ".tmp", 'w') as f:
+            json.dump(self.cache, f)
+        os.replace(self.cache_file + ".tmp", self.cache_file)
+
+    @staticmethod
+    def load_client():
+        """Imports the Google client libraries, e.g. on a background thread before the first sync."""
+        import google.auth.transport.requests
+        import google_auth_oauthlib.flow
+        import googleapiclient.discovery
+        import googleapiclient.http
 
     def authenticate(self):
         """Authenticates the user using OAuth2 flow."""
+        # Keep the existing service (and its HTTP connection) while the token is valid
+        if self.service is not None and (self.creds is None or self.creds.valid):
+            return True, "Already authenticated."
+        from google.auth.transport.requests import Request
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from googleapiclient.discovery import build
         self.creds = None
         # The file token.json stores the user's access and refresh tokens, and is
         # created automatically when the authorization flow completes for the first time.
@@ -61,89 +116,276 @@ class DriveSyncManager:
                 pickle.dump(self.creds, token)
 
         try:
-            self.service = build('drive', 'v3', credentials=self.creds)
+            self.service = build('drive', 'v3', credentials=self.creds, cache_discovery=False)
             return True, "Authenticated successfully."
         except Exception as e:
             return False, f"Failed to build service: {e}"
 
-    def upload_file(self, file_path, file_name=None):
-        """Uploads a file to Google Drive."""
+    def upload_file(self, file_path, file_name=None, chunk_size=None, num_retries=None):
+        """
+        Uploads a file to Google Drive as a resumable, chunked upload.
+        Skipped when Drive already has the same content (md5). An interrupted
+        upload is continued where it stopped on the next call, as long as the
+        local file did not change in between.
+        """
         if not self.service:
             return False, "Not authenticated."
 
         if not file_name:
             file_name = os.path.basename(file_path)
+        if num_retries is None:
+            num_retries = self.NUM_RETRIES
+
+        local_md5 = self._md5(file_path)
+        cached = self.cache.get(file_name, {})
 
         # Check if file already exists to update it instead of creating duplicate
-        existing_file_id = self._get_file_id(file_name)
+        existing_file = self.find_file(file_name)
+        existing_file_id = existing_file['id'] if existing_file else None
+
+        # Unchanged backups are not written again (see BackupManager), so an
+        # identical checksum means Drive already has this exact file
+        if existing_file and existing_file.get('md5Checksum') == local_md5:
+            self._remember(file_name, existing_file)
+            return True, f"Already up to date, file ID: {existing_file_id}"
 
         file_metadata = {'name': file_name}
-        media = MediaFileUpload(file_path, resumable=True)
+        from googleapiclient.http import MediaFileUpload
+        media = MediaFileUpload(file_path, chunksize=chunk_size or self.CHUNK_SIZE, resumable=True)
+        fields = 'id, md5Checksum, modifiedTime'
 
+        resuming = False
         try:
             if existing_file_id:
                 # Update existing file
-                file = self.service.files().update(
+                request = self.service.files().update(
                     fileId=existing_file_id,
-                    media_body=media).execute()
-                return True, f"Updated file ID: {file.get('id')}"
+                    media_body=media,
+                    fields=fields)
             else:
                 # Create new file
                 # Ideally check / create a folder "IronVault Backups"
-                file = self.service.files().create(
+                request = self.service.files().create(
                     body=file_metadata,
                     media_body=media,
-                    fields='id').execute()
-                return True, f"Created file ID: {file.get('id')}"
+                    fields=fields)
+
+            file = None
+            pending = cached.get('pending')
+            if pending and pending.get('md5') == local_md5 and pending.get('file_id') == existing_file_id:
+                # Same content as the interrupted upload: continue that session
+                resuming = True
+                file = self._resume_upload_session(request, pending['uri'], media.size())
+
+            while file is None:
+                status, file = request.next_chunk(num_retries=num_retries)
+                if file is None and request.resumable_uri != (pending or {}).get('uri'):
+                    # Remember the session so an interruption can be resumed later
+                    pending = {'uri': request.resumable_uri, 'md5': local_md5, 'file_id': existing_file_id}
+                    self.cache.setdefault(file_name, {})['pending'] = pending
+                    self._save_cache()
+
+            self._remember(file_name, file)
+            if existing_file_id:
+                return True, f"Updated file ID: {file.get('id')}"
+            return True, f"Created file ID: {file.get('id')}"
         except Exception as e:
+            if resuming:
+                # The session may have expired: start a new upload next time
+                self.cache[file_name].pop('pending', None)
+                self._save_cache()
             return False, f"Upload failed: {e}"
 
-    def list_backups(self):
-        """Lists backup files in Drive."""
+    @staticmethod
+    def _resume_upload_session(request, uri, size):
+        """
+        Asks Drive how many bytes of the upload session uri it already has (an
+        empty PUT with "Content-Range: bytes */size" on the request's own http),
+        and points the resumable HttpRequest at that session and offset, so
+        next_chunk() continues from there. Returns the file if the upload had
+        already completed, else None. Raises if the session is gone (expired).
+        """
+        headers = {'Content-Range': f"bytes */{size}", 'Content-Length': "0"}
+        response, content = request.http.request(uri, "PUT", headers=headers)
+        if response.status in (200, 201):
+            return json.loads(content)
+        if response.status != 308:
+            raise ConnectionError(f"HTTP {response.status} for upload session status")
+        # "range: bytes=0-<last byte received>", absent if nothing was received
+        received = response.get('range')
+        request.resumable_uri = uri
+        request.resumable_progress = int(received.rsplit("-", 1)[1]) + 1 if received else 0
+        return None
+
+    def _remember(self, file_name, file):
+        """Caches the ID/checksum of an up to date remote file (drops any pending upload)."""
+        self.cache[file_name] = {
+            'id': file.get('id'),
+            'md5': file.get('md5Checksum'),
+            'modifiedTime': file.get('modifiedTime')
+        }
+        self._save_cache()
+
+    def list_backups(self, name_prefix="vault", page_size=100):
+        """
+        Lists every backup file in Drive (vault.enc, its deltas and versions,
+        legacy vault.db), newest first, following nextPageToken through all pages.
+        """
+        return self.list_files(name_prefix, page_size)
+
+    def list_files(self, name_contains="", page_size=100):
+        """Files whose name contains name_contains (all files of the app if empty), newest first."""
         if not self.service:
             return []
         
+        query = "trashed = false"
+        if name_contains:
+            query = f"name contains '{name_contains}' and " + query
+        items = []
+        page_token = None
         try:
-            results = self.service.files().list(
-                q="name = 'vault.db' and trashed = false",
-                pageSize=10, fields="nextPageToken, files(id, name, modifiedTime)").execute()
-            items = results.get('files', [])
-            return items
+            while True:
+                results = self.service.files().list(
+                    q=query,
+                    pageSize=page_size, pageToken=page_token, orderBy="modifiedTime desc",
+                    fields="nextPageToken, files(id, name, size, md5Checksum, modifiedTime)").execute(num_retries=self.NUM_RETRIES)
+                items.extend(results.get('files', []))
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    return items
         except Exception as e:
             print(f"List failed: {e}")
-            return []
+            return items
 
-    def download_file(self, file_id, destination_path):
-        """Downloads a file from Drive."""
+    def download_file(self, file_id, destination_path, chunk_size=None, progress=None, num_retries=None):
+        """
+        Downloads a file from Drive, streamed chunk by chunk to destination_path + ".part"
+        and renamed into place once complete and verified (md5), so memory use
+        stays flat and destination_path is never left half written.
+        A .part left by an interrupted download is continued with a Range request.
+        progress(done_bytes, total_bytes) is called after every chunk.
+        """
         if not self.service:
             return False, "Not authenticated."
 
+        part_path = destination_path + ".part"
+        if num_retries is None:
+            num_retries = self.NUM_RETRIES
         try:
-            request = self.service.files().get_media(fileId=file_id)
-            fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            done = False
-            while done is False:
-                status, done = downloader.next_chunk()
-            
-            with open(destination_path, 'wb') as f:
-                f.write(fh.getbuffer())
-            return True, "Download complete."
+            remote = self.service.files().get(fileId=file_id, fields="id, size, md5Checksum").execute(num_retries=self.NUM_RETRIES)
+            total = int(remote.get('size') or 0)
+            expected_md5 = remote.get('md5Checksum')
+
+            for attempt in range(2):
+                offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                if offset > total:
+                    offset = 0 # Remote file shrank, the partial copy is stale
+                with open(part_path, 'r+b' if offset else 'wb') as fh:
+                    fh.seek(offset)
+                    fh.truncate()
+                    request = self.service.files().get_media(fileId=file_id) if offset < total else None
+                    while offset < total:
+                        # Continues after the bytes we already have
+                        end = min(offset + (chunk_size or self.CHUNK_SIZE), total) - 1
+                        status, content = self._get_range(request, offset, end, num_retries)
+                        if status == 200 and offset:
+                            # Range ignored, the whole file came back
+                            fh.seek(0)
+                            fh.truncate()
+                            offset = 0
+                        if not content:
+                            break # 416, nothing more to read (checked by the md5 below)
+                        fh.write(content)
+                        offset += len(content)
+                        if progress:
+                            progress(offset, total)
+
+                if not expected_md5 or self._md5(part_path) == expected_md5:
+                    os.replace(part_path, destination_path)
+                    return True, "Download complete."
+                # The remote file changed since the partial download: start over once
+                os.remove(part_path)
+            return False, "Download failed: checksum mismatch."
         except Exception as e:
+            # The .part file is kept so the next call can resume
             return False, f"Download failed: {e}"
 
-    def _get_file_id(self, filename):
-        """Helper to check if a file exists."""
-        items = self.list_backups() # This filters by vault.db specifically in list_backups q param
-        # We might want to make list_backups more generic or this helper more specific
-        # For now, let's just search specifically
+    @staticmethod
+    def _get_range(request, start, end, num_retries):
+        """
+        GETs bytes start..end of a get_media request with an explicit Range header
+        on the request's own (authorized) http. Network errors, 5xx and 429 are
+        retried with randomized exponential backoff. Returns (status, content).
+        """
+        headers = dict(request.headers)
+        headers['range'] = f"bytes={start}-{end}"
+        for attempt in range(num_retries + 1):
+            if attempt:
+                time.sleep(random.random() * 2 ** attempt)
+            try:
+                response, content = request.http.request(request.uri, "GET", headers=headers)
+            except OSError: # Connection reset, timeout, ...
+                if attempt == num_retries:
+                    raise
+                continue
+            if response.status in (200, 206):
+                return response.status, content
+            if response.status == 416:
+                return response.status, b""
+            if response.status < 500 and response.status != 429 or attempt == num_retries:
+                raise ConnectionError(f"HTTP {response.status} for bytes {start}-{end}")
+
+    @staticmethod
+    def _md5(file_path, chunk_size=1024 * 1024):
+        digest = hashlib.md5()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def find_file(self, file_name):
+        """Returns {'id', 'name', 'size', 'md5Checksum', 'modifiedTime'} of the file named file_name, or None."""
+        # Known file ID: one metadata call instead of a files().list search
+        cached = self.cache.get(file_name, {})
+        file = self._get_file_by_id(cached['id']) if cached.get('id') else None
+        return file or self._get_file(file_name)
+
+    def delete_file(self, file_name):
+        """Deletes the file named file_name from Drive (success if it does not exist)."""
+        if not self.service:
+            return False, "Not authenticated."
+        file = self.find_file(file_name)
+        if file is None:
+            return True, "Not found, nothing to delete."
+        try:
+            self.service.files().delete(fileId=file['id']).execute(num_retries=self.NUM_RETRIES)
+        except Exception as e:
+            return False, f"Delete failed: {e}"
+        if file_name in self.cache:
+            del self.cache[file_name]
+            self._save_cache()
+        return True, f"Deleted file ID: {file['id']}"
+
+    def _get_file_by_id(self, file_id):
+        """Returns {'id', 'name', 'size', 'md5Checksum', 'modifiedTime'} of a file, or None if it is gone."""
+        try:
+            file = self.service.files().get(
+                fileId=file_id, fields="id, name, size, md5Checksum, modifiedTime, trashed").execute(num_retries=self.NUM_RETRIES)
+            if not file.get('trashed'):
+                return file
+        except Exception:
+            pass
+        return None
+
+    def _get_file(self, filename):
+        """Returns {'id', 'name', 'size', 'md5Checksum', 'modifiedTime'} of the file named filename, or None."""
         try:
             results = self.service.files().list(
                 q=f"name = '{filename}' and trashed = false",
-                pageSize=1, fields="files(id, name)").execute()
+                pageSize=1, fields="files(id, name, size, md5Checksum, modifiedTime)").execute(num_retries=self.NUM_RETRIES)
             files = results.get('files', [])
             if files:
-                return files[0]['id']
+                return files[0]
         except:
             pass
         return None
@@ -0,0 +1,118 @@
+import time
+import uuid as uuid_module
+
+class VaultMerger:
+    """
+    Merges another copy of the vault (e.g. the backup written by a second device)
+    into the local one, entry by entry (matched by UUID):
+
+    - an entry present on one side only is added, unless the other side deleted
+      it later (tombstone), in which case the deletion wins
+    - an entry changed on one side only takes the newest version (modified_at,
+      then revision)
+    - an entry changed on both sides since the last merge (or differing on the
+      first merge, which has no baseline) is a conflict:
+      "lww" keeps the newest version, "conflict_copy" (default) keeps the newest
+      and adds the other one as a copy titled "... (conflict copy)"
+
+    Only changed rows are written, in one transaction. Both vaults must share the
+    master key (same salt and verifier), since ciphertexts are copied as is.
+    """
+    STRATEGIES = ("lww", "conflict_copy")
+    LAST_MERGE_KEY = "last_merge_at"
+    # Conflict copies get a deterministic UUID, so merging twice does not duplicate them
+    CONFLICT_NAMESPACE = uuid_module.UUID("6f2a4c1e-9b7d-4e5a-8c3f-1d2e3f4a5b6c")
+    ENTRY_COLUMNS = ("uuid", "category", "title", "username", "email", "ciphertext", "nonce",
+                     "modified_at", "revision")
+
+    def __init__(self, local_db, strategy="conflict_copy"):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown merge strategy '{strategy}'.")
+        self.local_db = local_db
+        self.strategy = strategy
+
+    @classmethod
+    def _entry(cls, row):
+        keys = row.keys()
+        return {column: (row[column] if column in keys else None) for column in cls.ENTRY_COLUMNS}
+
+    @staticmethod
+    def _same_content(local, remote):
+        return all(local[column] == remote[column] for column in
+                   ("category", "title", "username", "email", "ciphertext", "nonce"))
+
+    @staticmethod
+    def _version(entry):
+        return (entry['modified_at'] or 0, entry['revision'] or 0)
+
+    def _conflict_copy(self, entry):
+        copy = dict(entry)
+        copy['uuid'] = str(uuid_module.uuid5(self.CONFLICT_NAMESPACE, f"{entry['uuid']}:{entry['modified_at']}"))
+        copy['title'] = f"{entry['title'] or ''} (conflict copy)"
+        return copy
+
+    def check_same_key(self, remote_db):
+        for key in ("salt", "verifier"):
+            if self.local_db.get_meta(key) != remote_db.get_meta(key):
+                raise ValueError("The other vault uses a different master password or key parameters.")
+
+    def plan(self, remote_db) -> tuple[list, dict]:
+        """
+        Computes the changes to apply locally, without writing anything.
+        Returns (changes for DBManager.apply_changes, counts).
+        """
+        self.check_same_key(remote_db)
+        local = {uuid: self._entry(row) for uuid, row in self.local_db.get_entry_states().items()}
+        remote = {uuid: self._entry(row) for uuid, row in remote_db.get_entry_states().items()}
+        local_deleted = self.local_db.get_tombstones()
+        remote_deleted = remote_db.get_tombstones()
+        last_merge = self.local_db.get_meta(self.LAST_MERGE_KEY)
+
+        changes = []
+        counts = {"added": 0, "updated": 0, "deleted": 0, "conflicts": 0, "unchanged": 0}
+        for uuid in local.keys() | remote.keys():
+            mine = local.get(uuid)
+            theirs = remote.get(uuid)
+
+            if mine is None:
+                # Deleted here after their last change: stays deleted
+                if local_deleted.get(uuid, -1) >= (theirs['modified_at'] or 0):
+                    counts["unchanged"] += 1
+                    continue
+                changes.append(theirs)
+                counts["added"] += 1
+            elif theirs is None:
+                if remote_deleted.get(uuid, -1) >= (mine['modified_at'] or 0):
+                    changes.append({"uuid": uuid, "deleted": True, "deleted_at": remote_deleted[uuid]})
+                    counts["deleted"] += 1
+                else:
+                    counts["unchanged"] += 1 # New here, the next backup carries it over
+            elif self._same_content(mine, theirs):
+                counts["unchanged"] += 1
+            else:
+                theirs_newer = self._version(theirs) > self._version(mine)
+                # Without a previous merge there is no baseline to tell which side changed
+                both_changed = last_merge is None \
+                    or ((mine['modified_at'] or 0) > last_merge and (theirs['modified_at'] or 0) > last_merge)
+                if both_changed and self.strategy == "conflict_copy":
+                    if theirs_newer:
+                        changes.append(theirs)
+                        changes.append(self._conflict_copy(mine))
+                    else:
+                        changes.append(self._conflict_copy(theirs))
+                    counts["conflicts"] += 1
+                elif theirs_newer:
+                    changes.append(theirs)
+                    counts["updated"] += 1
+                else:
+                    counts["unchanged"] += 1
+        return changes, counts
+
+    def merge(self, remote_db) -> dict:
+        """Merges remote_db (a DBManager, can be read only) into the local vault. Returns the counts."""
+        changes, counts = self.plan(remote_db)
+        with self.local_db.transaction():
+            if changes:
+                self.local_db.apply_changes(changes)
+            self.local_db.set_meta(self.LAST_MERGE_KEY, time.time())
+        return counts
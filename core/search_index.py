@@ -0,0 +1,174 @@
+import re
+
+class SearchIndex:
+    """
+    In-memory trigram index over the plaintext metadata of the entries.
+    Secrets are never indexed.
+
+    search() returns the matching uuids ranked best first:
+    title matches beat username/email matches, prefixes beat substrings,
+    and typos are tolerated through trigram overlap ("fuzzy search").
+    """
+    FIELDS = ("title", "category", "username", "email")
+    # Per field weight used for ranking
+    WEIGHTS = {"title": 4.0, "category": 2.0, "username": 1.5, "email": 1.0}
+    # Share of the query trigrams a text must contain to count as a fuzzy match
+    FUZZY_THRESHOLD = 0.6
+    # Above this many matches, results are not ranked (nearly everything is shown anyway)
+    RANK_LIMIT = 500
+
+    _token_re = re.compile(r"[^\W_]+", re.UNICODE)
+
+    def __init__(self):
+        self._docs = {}   # uuid -> {field: lowercased text}
+        self._tokens = {} # uuid -> {field: tuple of words}, for prefix ranking
+        self._text = {}   # uuid -> all fields joined, for fast substring checks
+        self._grams = {}  # trigram -> set of uuids
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, uuid):
+        return uuid in self._docs
+
+    @staticmethod
+    def _ngrams(text, n):
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def _doc_grams(self, doc):
+        grams = set()
+        for text in doc.values():
+            grams |= self._ngrams(text, 3)
+        return grams
+
+    def rebuild(self, entries):
+        """Indexes every entry from scratch (entries are rows/dicts with the metadata columns)."""
+        self._docs = {}
+        self._tokens = {}
+        self._text = {}
+        self._grams = {}
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        uuid = entry['uuid']
+        if uuid in self._docs:
+            self.remove(uuid)
+        doc = {field: (entry[field] or "").lower() for field in self.FIELDS}
+        self._docs[uuid] = doc
+        self._tokens[uuid] = {field: tuple(self._token_re.findall(text)) for field, text in doc.items()}
+        self._text[uuid] = "\n".join(doc.values())
+        for gram in self._doc_grams(doc):
+            self._grams.setdefault(gram, set()).add(uuid)
+
+    def update(self, entry):
+        self.add(entry)
+
+    def remove(self, uuid):
+        doc = self._docs.pop(uuid, None)
+        if doc is None:
+            return
+        del self._tokens[uuid]
+        del self._text[uuid]
+        for gram in self._doc_grams(doc):
+            postings = self._grams.get(gram)
+            if postings is not None:
+                postings.discard(uuid)
+                if not postings:
+                    del self._grams[gram]
+
+    def _candidates(self, term):
+        """
+        uuids whose text may contain term (superset, verified by the caller).
+        Returns None for terms shorter than a trigram, meaning "every entry".
+        """
+        if len(term) < 3:
+            return None
+        result = None
+        for gram in sorted(self._ngrams(term, 3), key=lambda g: len(self._grams.get(g, ()))):
+            postings = self._grams.get(gram)
+            if not postings:
+                return set()
+            result = set(postings) if result is None else result & postings
+            if not result:
+                break
+        return result or set()
+
+    def _fuzzy_candidates(self, term, pool=None):
+        """uuids sharing at least FUZZY_THRESHOLD of the term's trigrams, with their overlap ratio."""
+        grams = self._ngrams(term, 3)
+        if not grams:
+            return {}
+        counts = {}
+        for gram in grams:
+            postings = self._grams.get(gram, ())
+            if pool is not None:
+                postings = postings & pool if postings else ()
+            for uuid in postings:
+                counts[uuid] = counts.get(uuid, 0) + 1
+        needed = len(grams) * self.FUZZY_THRESHOLD
+        return {uuid: count / len(grams) for uuid, count in counts.items() if count >= needed}
+
+    def _score_exact(self, uuid, term):
+        best = 0.0
+        for field, text in self._docs[uuid].items():
+            if term not in text:
+                continue
+            if text == term:
+                score = 1.0
+            elif text.startswith(term):
+                score = 0.8
+            elif any(token.startswith(term) for token in self._tokens[uuid][field]):
+                score = 0.6
+            else:
+                score = 0.4
+            best = max(best, score * self.WEIGHTS[field])
+        return best
+
+    def search(self, query, limit=None):
+        """
+        Returns the uuids matching every term of query, best match first.
+        Terms without a substring match fall back to trigram (typo tolerant) matching.
+        More than RANK_LIMIT matches are returned unordered.
+        An empty query returns None, meaning "no filter".
+        """
+        terms = query.lower().split()
+        if not terms:
+            return None
+
+        # Most selective terms first, so the later ones only verify a few entries
+        candidates = [(term, self._candidates(term)) for term in terms]
+        candidates.sort(key=lambda item: len(self._docs) if item[1] is None else len(item[1]))
+
+        scores = None
+        for term, term_candidates in candidates:
+            pool = None if scores is None else set(scores)
+            if term_candidates is None:
+                term_candidates = pool if pool is not None else self._docs.keys()
+            elif pool is not None:
+                term_candidates = term_candidates & pool
+
+            texts = self._text
+            matched = [uuid for uuid in term_candidates if term in texts[uuid]]
+            if len(matched) <= self.RANK_LIMIT:
+                term_scores = {uuid: self._score_exact(uuid, term) for uuid in matched}
+            else:
+                term_scores = dict.fromkeys(matched, 1.0)
+            if not term_scores and len(term) >= 4:
+                for uuid, ratio in self._fuzzy_candidates(term, pool).items():
+                    term_scores[uuid] = 0.3 * ratio * self.WEIGHTS["title"]
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {uuid: scores[uuid] + score for uuid, score in term_scores.items()}
+            if not scores:
+                return []
+
+        if len(scores) > self.RANK_LIMIT:
+            return list(scores)[:limit]
+
+        ranked = sorted(scores, key=lambda uuid: (-scores[uuid], self._docs[uuid]['title']))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return ranked
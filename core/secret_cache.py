@@ -0,0 +1,32 @@
+from collections import OrderedDict
+
+class SecretCache:
+    """
+    Small LRU cache for recently decrypted secrets.
+    Keeps only a handful of plaintext payloads in memory instead of the whole vault.
+    """
+    def __init__(self, max_size=16):
+        self.max_size = max_size
+        self._items = OrderedDict()
+
+    def get(self, uuid):
+        """Returns the cached secret for uuid (and marks it as recently used), or None."""
+        secret = self._items.get(uuid)
+        if secret is not None:
+            self._items.move_to_end(uuid)
+        return secret
+
+    def put(self, uuid, secret):
+        self._items[uuid] = secret
+        self._items.move_to_end(uuid)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def invalidate(self, uuid):
+        self._items.pop(uuid, None)
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
@@ -1,8 +1,67 @@
+import os
+import time
 import secrets
 from argon2.low_level import hash_secret_raw, Type
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 from cryptography.hazmat.primitives import hashes
+from core.crypto_pool import CryptoPool
+
+class VaultCipher:
+    """
+    AES-GCM context bound to the derived vault key.
+    The AESGCM instance (and its key setup) is created once and reused for every entry.
+    Call wipe() when the vault is locked/closed.
+    """
+    def __init__(self, key: bytes):
+        self._key = bytearray(key)
+        self._aesgcm = AESGCM(bytes(key))
+
+    @classmethod
+    def of(cls, key):
+        """Returns key itself if it is already a VaultCipher, otherwise a new one for the raw key."""
+        if isinstance(key, cls):
+            return key
+        return cls(key)
+
+    @property
+    def key(self) -> bytes:
+        if self._aesgcm is None:
+            raise ValueError("Vault cipher has been wiped.")
+        return bytes(self._key)
+
+    @property
+    def aesgcm(self) -> AESGCM:
+        if self._aesgcm is None:
+            raise ValueError("Vault cipher has been wiped.")
+        return self._aesgcm
+
+    def __bool__(self):
+        return self._aesgcm is not None
+
+    def encrypt(self, data: str) -> tuple[bytes, bytes]:
+        """Encrypts a string. Returns (nonce, ciphertext)."""
+        return self.encrypt_bytes(data.encode())
+
+    def decrypt(self, nonce: bytes, ciphertext: bytes) -> str:
+        return self.decrypt_bytes(nonce, ciphertext).decode()
+
+    def encrypt_bytes(self, data: bytes, associated_data: bytes = None) -> tuple[bytes, bytes]:
+        nonce = secrets.token_bytes(12)
+        return nonce, self.aesgcm.encrypt(nonce, data, associated_data)
+
+    def decrypt_bytes(self, nonce: bytes, ciphertext: bytes, associated_data: bytes = None) -> bytes:
+        return self.aesgcm.decrypt(nonce, ciphertext, associated_data)
+
+    def wipe(self):
+        """
+        Drops the AESGCM instance and zeroes our copy of the key.
+        Best effort: Python may still hold copies of the bytes elsewhere.
+        """
+        for i in range(len(self._key)):
+            self._key[i] = 0
+        self._aesgcm = None
+
 
 class SecurityManager:
     def __init__(self):
@@ -23,37 +82,108 @@ class SecurityManager:
         """Generates a random salt."""
         return secrets.token_bytes(length)
 
+    # Argon2id parameters of vaults created before they were stored in the metadata
+    LEGACY_KDF_PARAMS = {"time_cost": 2, "memory_cost": 64 * 1024, "parallelism": 4}
+    KDF_TARGET_MS = 500              # Unlock latency aimed at by calibrate_kdf
+    KDF_MAX_MEMORY = 1024 * 1024     # KiB (1 GB), upper bound for calibrate_kdf
+    KDF_MAX_PARALLELISM = 16
+
     @staticmethod
-    def derive_key(password: str, salt: bytes) -> bytes:
+    def derive_key(password: str, salt: bytes, params: dict = None) -> bytes:
         """
         Derives a key from the password using Argon2id via argon2-cffi.
+        params: time_cost, memory_cost (KiB) and parallelism, LEGACY_KDF_PARAMS if None.
         """
+        params = params or SecurityManager.LEGACY_KDF_PARAMS
         return hash_secret_raw(
             secret=password.encode(),
             salt=salt,
-            time_cost=2,
-            memory_cost=64 * 1024,  # 64 MB
-            parallelism=4,
+            time_cost=params["time_cost"],
+            memory_cost=params["memory_cost"],
+            parallelism=params["parallelism"],
             hash_len=32,
             type=Type.ID
         )
 
+    @classmethod
+    def calibrate_kdf(cls, target_ms: int = None, parallelism: int = None) -> dict:
+        """
+        Benchmarks Argon2id on this machine and returns params whose derivation
+        takes about target_ms, using one lane per CPU core.
+        Memory is raised first (the part that hurts GPU attackers), then the
+        number of passes. Never weaker than LEGACY_KDF_PARAMS.
+        """
+        target = (target_ms or cls.KDF_TARGET_MS) / 1000
+        lanes = parallelism or min(os.cpu_count() or 1, cls.KDF_MAX_PARALLELISM)
+        salt = cls.generate_salt()
+
+        def measure(memory_cost):
+            start = time.perf_counter()
+            cls.derive_key("calibration", salt, {"time_cost": 1, "memory_cost": memory_cost, "parallelism": lanes})
+            return time.perf_counter() - start
+
+        memory_cost = cls.LEGACY_KDF_PARAMS["memory_cost"]
+        elapsed = measure(memory_cost)
+        # Keep at least 2 passes within the target
+        while elapsed * 4 <= target and memory_cost * 2 <= cls.KDF_MAX_MEMORY:
+            memory_cost *= 2
+            elapsed = measure(memory_cost)
+
+        time_cost = max(cls.LEGACY_KDF_PARAMS["time_cost"], int(target / elapsed))
+        return {"time_cost": time_cost, "memory_cost": memory_cost, "parallelism": lanes}
+
     @staticmethod
-    def encrypt(data: str, key: bytes) -> tuple[bytes, bytes]:
+    def encrypt(data: str, key) -> tuple[bytes, bytes]:
         """
         Encrypts data using AES-GCM.
+        key is a VaultCipher (preferred, reuses its AESGCM) or the raw key bytes.
         Returns (nonce, ciphertext).
         """
-        aesgcm = AESGCM(key)
-        nonce = secrets.token_bytes(12)
-        ciphertext = aesgcm.encrypt(nonce, data.encode(), None)
-        return nonce, ciphertext
+        return VaultCipher.of(key).encrypt(data)
 
     @staticmethod
-    def decrypt(nonce: bytes, ciphertext: bytes, key: bytes) -> str:
+    def decrypt(nonce: bytes, ciphertext: bytes, key) -> str:
         """
         Decrypts data using AES-GCM.
+        key is a VaultCipher (preferred, reuses its AESGCM) or the raw key bytes.
+        """
+        return VaultCipher.of(key).decrypt(nonce, ciphertext)
+
+    @staticmethod
+    def encrypt_many(items, key, pool=None) -> list:
+        """
+        Encrypts many strings, spread over the CryptoPool.
+        Returns a list in input order of (True, (nonce, ciphertext)) or (False, error).
         """
-        aesgcm = AESGCM(key)
-        plaintext = aesgcm.decrypt(nonce, ciphertext, None)
-        return plaintext.decode()
+        aesgcm = VaultCipher.of(key).aesgcm # One instance shared by every batch
+
+        def encrypt_batch(batch):
+            results = []
+            for data in batch:
+                try:
+                    nonce = secrets.token_bytes(12)
+                    results.append((True, (nonce, aesgcm.encrypt(nonce, data.encode(), None))))
+                except Exception as e:
+                    results.append((False, e))
+            return results
+
+        return (pool or CryptoPool.shared()).map_batches(encrypt_batch, items)
+
+    @staticmethod
+    def decrypt_many(pairs, key, pool=None) -> list:
+        """
+        Decrypts many (nonce, ciphertext) pairs, spread over the CryptoPool.
+        Returns a list in input order of (True, plaintext) or (False, error).
+        """
+        aesgcm = VaultCipher.of(key).aesgcm
+
+        def decrypt_batch(batch):
+            results = []
+            for nonce, ciphertext in batch:
+                try:
+                    results.append((True, aesgcm.decrypt(nonce, ciphertext, None).decode()))
+                except Exception as e:
+                    results.append((False, e))
+            return results
+
+        return (pool or CryptoPool.shared()).map_batches(decrypt_batch, pairs)
@@ -0,0 +1,283 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+class StorageBackend:
+    """
+    Where backups are kept (see BackupManager). Files are addressed by relative
+    names using '/' as separator, e.g. "vault.enc" or "versions/index.enc".
+    Bodies are streamed: put reads a binary file object, get writes into one.
+
+    Implementations: LocalStorage (backup folder), DriveStorage (Google Drive)
+    and MemoryStorage (in process, for tests and benchmarks).
+    """
+    COPY_CHUNK = 1024 * 1024
+
+    def is_available(self) -> bool:
+        return True
+
+    def location(self, name) -> str:
+        """Human readable place of name, for messages."""
+        return name
+
+    def put(self, name, src):
+        """Stores the content of the binary stream src as name, replacing it atomically."""
+        raise NotImplementedError
+
+    def get(self, name, dst):
+        """Writes the content of name into the binary stream dst. Raises FileNotFoundError."""
+        raise NotImplementedError
+
+    def list(self, prefix="") -> list:
+        """Files whose name starts with prefix: dicts with name, size and modified (epoch seconds)."""
+        raise NotImplementedError
+
+    def stat(self, name):
+        """{name, size, modified} of name, or None if it does not exist."""
+        raise NotImplementedError
+
+    def delete(self, name):
+        """Removes name (no error if it does not exist)."""
+        raise NotImplementedError
+
+    # --- Helpers built on the operations above ---
+
+    def exists(self, name) -> bool:
+        return self.stat(name) is not None
+
+    def put_bytes(self, name, data: bytes):
+        self.put(name, io.BytesIO(data))
+
+    def get_bytes(self, name) -> bytes:
+        buffer = io.BytesIO()
+        self.get(name, buffer)
+        return buffer.getvalue()
+
+    def reader(self, name):
+        """Readable binary file object with the content of name (a spooled copy by default)."""
+        buffer = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        try:
+            self.get(name, buffer)
+        except Exception:
+            buffer.close()
+            raise
+        buffer.seek(0)
+        return buffer
+
+    def put_file(self, name, path):
+        with open(path, 'rb') as f:
+            self.put(name, f)
+
+    def get_file(self, name, path):
+        """Downloads name to the local file path (replaced only once complete)."""
+        try:
+            with open(path + ".tmp", 'wb') as f:
+                self.get(name, f)
+            os.replace(path + ".tmp", path)
+        finally:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+
+
+class LocalStorage(StorageBackend):
+    """A folder on disk (the backup folder, which may itself be synced by another tool)."""
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, name):
+        return os.path.join(self.root, *name.split("/"))
+
+    def is_available(self) -> bool:
+        return bool(self.root) and os.path.isdir(self.root)
+
+    def location(self, name) -> str:
+        return self._path(name)
+
+    def put(self, name, src):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written to a temp file first so an interrupted write never replaces the previous file
+        with open(path + ".tmp", 'wb') as f:
+            shutil.copyfileobj(src, f, self.COPY_CHUNK)
+        os.replace(path + ".tmp", path)
+
+    def get(self, name, dst):
+        with open(self._path(name), 'rb') as f:
+            shutil.copyfileobj(f, dst, self.COPY_CHUNK)
+
+    def reader(self, name):
+        return open(self._path(name), 'rb')
+
+    def list(self, prefix="") -> list:
+        files = []
+        for folder, _dirs, names in os.walk(self.root):
+            relative = os.path.relpath(folder, self.root).replace(os.sep, "/")
+            for file_name in names:
+                name = file_name if relative == "." else f"{relative}/{file_name}"
+                if name.startswith(prefix) and not name.endswith(".tmp"):
+                    files.append(self.stat(name))
+        return [f for f in files if f is not None]
+
+    def stat(self, name):
+        try:
+            st = os.stat(self._path(name))
+        except FileNotFoundError:
+            return None
+        return {"name": name, "size": st.st_size, "modified": st.st_mtime}
+
+    def delete(self, name):
+        path = self._path(name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class MemoryStorage(StorageBackend):
+    """
+    In-process backend keeping files in a dict, so backup, retention and sync
+    logic can be tested and benchmarked offline. Counts the operations and bytes
+    moved; set fail_puts to make the next puts raise (simulated outage).
+    """
+    def __init__(self):
+        self.files = {} # name -> (bytes, modified)
+        self.calls = []
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.fail_puts = 0
+
+    def location(self, name) -> str:
+        return f"memory:{name}"
+
+    def put(self, name, src):
+        self.calls.append("put")
+        if self.fail_puts:
+            self.fail_puts -= 1
+            raise ConnectionError("Simulated storage failure")
+        data = src.read()
+        self.files[name] = (data, time.time())
+        self.bytes_written += len(data)
+
+    def get(self, name, dst):
+        self.calls.append("get")
+        if name not in self.files:
+            raise FileNotFoundError(name)
+        data = self.files[name][0]
+        dst.write(data)
+        self.bytes_read += len(data)
+
+    def list(self, prefix="") -> list:
+        self.calls.append("list")
+        return [self._stat(name) for name in sorted(self.files) if name.startswith(prefix)]
+
+    def stat(self, name):
+        self.calls.append("stat")
+        return self._stat(name) if name in self.files else None
+
+    def _stat(self, name):
+        data, modified = self.files[name]
+        return {"name": name, "size": len(data), "modified": modified}
+
+    def delete(self, name):
+        self.calls.append("delete")
+        self.files.pop(name, None)
+
+
+class DriveStorage(StorageBackend):
+    """
+    Google Drive through an authenticated DriveSyncManager (resumable uploads,
+    md5 skip of unchanged files, ranged downloads). Names are Drive file names.
+    Runs network calls: use it from a worker thread (see DriveSyncWorker).
+    """
+    def __init__(self, manager):
+        self.manager = manager
+
+    def is_available(self) -> bool:
+        return self.manager.service is not None
+
+    def location(self, name) -> str:
+        return f"Google Drive: {name}"
+
+    @staticmethod
+    def _check(result):
+        success, msg = result
+        if not success:
+            raise ConnectionError(msg)
+        return msg
+
+    def put(self, name, src):
+        path = getattr(src, 'name', None)
+        if isinstance(path, str) and os.path.isfile(path) and src.tell() == 0:
+            # Already a local file: upload it directly
+            self._check(self.manager.upload_file(path, name))
+            return
+        fd, temp_path = tempfile.mkstemp(prefix="ironvault_upload_")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                shutil.copyfileobj(src, f, self.COPY_CHUNK)
+            self._check(self.manager.upload_file(temp_path, name))
+        finally:
+            os.remove(temp_path)
+
+    def get(self, name, dst):
+        file = self.manager.find_file(name)
+        if file is None:
+            raise FileNotFoundError(name)
+        fd, temp_path = tempfile.mkstemp(prefix="ironvault_download_")
+        os.close(fd)
+        try:
+            self._check(self.manager.download_file(file['id'], temp_path))
+            with open(temp_path, 'rb') as f:
+                shutil.copyfileobj(f, dst, self.COPY_CHUNK)
+        finally:
+            for path in (temp_path, temp_path + ".part"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @staticmethod
+    def _stat(file):
+        modified = file.get('modifiedTime')
+        return {"name": file['name'], "size": int(file.get('size') or 0),
+                "modified": datetime.fromisoformat(modified.replace("Z", "+00:00")).timestamp() if modified else 0}
+
+    def list(self, prefix="") -> list:
+        return [self._stat(f) for f in self.manager.list_files(prefix) if f['name'].startswith(prefix)]
+
+    def stat(self, name):
+        file = self.manager.find_file(name)
+        return self._stat(file) if file else None
+
+    def delete(self, name):
+        self._check(self.manager.delete_file(name))
+
+
+def mirror(source, target, prefix="", names=None, prune=()) -> tuple[int, int, int]:
+    """
+    Copies the files of source missing from target or different from it (size,
+    or newer), e.g. the local backup folder to Drive. names limits the copy to
+    those files. Then deletes the target files starting with one of the prune
+    prefixes that source no longer has (e.g. compacted deltas, expired versions);
+    nothing else is deleted from target. Returns (copied, skipped, deleted).
+    """
+    target_files = {f['name']: f for f in target.list(prefix)}
+    source_files = source.list(prefix)
+    copied = skipped = deleted = 0
+    for file in source_files:
+        if names is not None and file['name'] not in names:
+            continue
+        remote = target_files.get(file['name'])
+        if remote is not None and remote['size'] == file['size'] and remote['modified'] >= file['modified']:
+            skipped += 1
+            continue
+        with source.reader(file['name']) as src:
+            target.put(file['name'], src)
+        copied += 1
+
+    # After the copy, so the target's manifest never lists a deleted file
+    current = {file['name'] for file in source_files}
+    for name in target_files:
+        if name.startswith(tuple(prune)) and name not in current:
+            target.delete(name)
+            deleted += 1
+    return copied, skipped, deleted
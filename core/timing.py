@@ -0,0 +1,41 @@
+import time
+from contextlib import contextmanager
+
+class PhaseTimer:
+    """
+    Records how long each named phase of a flow takes (unlock, startup...):
+
+        timer = PhaseTimer("Unlock")
+        with timer.phase("kdf"):
+            derive_key(...)
+        print(timer.report())
+
+    Phases are kept in order; a phase timed twice is accumulated.
+    """
+    def __init__(self, name=""):
+        self.name = name
+        self.phases = {} # phase name -> seconds
+        self.started_at = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def mark(self, name):
+        """Records the time elapsed since the timer was created under name (e.g. "first paint")."""
+        self.phases[name] = time.perf_counter() - self.started_at
+
+    def get(self, name, default=None):
+        return self.phases.get(name, default)
+
+    def report(self) -> str:
+        """One line: 'Unlock: metadata 0.2 ms, kdf 498.1 ms, verify 0.0 ms'."""
+        parts = [f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.phases.items()]
+        return f"{self.name}: " + ", ".join(parts) if self.name else ", ".join(parts)
@@ -1,20 +1,134 @@
 import sqlite3
 import os
+import re
 import json
-from core.security import SecurityManager
+import time
+import hmac
+from contextlib import contextmanager
+from core.security import SecurityManager, VaultCipher
+from core.timing import PhaseTimer
 
 class DBManager:
-    def __init__(self, db_path="vault.db"):
+    # Plaintext columns mirrored into the FTS5 index, with their bm25 weights.
+    # Secrets (ciphertext) are never indexed.
+    SEARCH_COLUMNS = (("title", 10.0), ("category", 5.0), ("username", 2.0), ("email", 1.0))
+
+    # Connection profiles (PRAGMAs applied on connect).
+    # "legacy": SQLite defaults, rollback journal and a full fsync per commit.
+    # "wal": write-ahead log, readers (UI, sync worker, backup) never block the
+    # single writer and vice versa; synchronous=NORMAL only fsyncs at checkpoints,
+    # which is still safe against corruption in WAL mode.
+    PROFILES = {
+        "legacy": {
+            "journal_mode": "DELETE",
+            "synchronous": "FULL",
+        },
+        "wal": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -16000,      # KiB (negative = size, not pages): 16 MB page cache
+            "temp_store": "MEMORY",
+            "mmap_size": 64 * 1024 * 1024,
+            "busy_timeout": 5000,      # ms to wait for the writer lock instead of failing
+        },
+    }
+    DEFAULT_PROFILE = "wal"
+
+    def __init__(self, db_path="vault.db", profile=None, read_only=False, ensure_schema=True):
+        """
+        profile is a key of PROFILES (or a dict of PRAGMAs), DEFAULT_PROFILE if None.
+        read_only=True opens an extra reader connection on an existing vault:
+        no tables are created and writes fail.
+        ensure_schema=False skips creating tables and migrations, for short-lived
+        connections on a vault already opened once (e.g. the login one).
+        """
         self.db_path = db_path
         self.conn = None
+        self.fts_enabled = False
+        self.read_only = read_only
+        self.profile = profile or self.DEFAULT_PROFILE
+        self._transaction_depth = 0
         # Connect immediately to ensure tables exist or to check if it's a new vault
         self._connect()
+        if read_only or not ensure_schema:
+            self.fts_enabled = self._has_table("entries_fts")
+            return
         self._create_tables()
         self._check_schema()
+        self._create_search_index()
+        self._create_changelog()
 
     def _connect(self):
-        self.conn = sqlite3.connect(self.db_path)
+        if self.read_only:
+            uri = "file:" + os.path.abspath(self.db_path).replace("?", "%3f").replace("#", "%23") + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True)
+        else:
+            self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
+        self._apply_profile()
+
+    def _apply_profile(self):
+        pragmas = self.PROFILES[self.profile] if isinstance(self.profile, str) else self.profile
+        cursor = self.conn.cursor()
+        for name, value in pragmas.items():
+            if name == "journal_mode" and self.read_only:
+                continue # Persistent setting of the file, only the writer changes it
+            cursor.execute(f"PRAGMA {name}={value}")
+            if name == "journal_mode":
+                cursor.fetchone()
+
+    def _has_table(self, name):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name=?", (name,))
+        return cursor.fetchone() is not None
+
+    def _commit(self):
+        # Inside transaction() the commit is deferred to the end of the block
+        if not self._transaction_depth:
+            self.conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups several writes into a single commit:
+
+            with db.transaction():
+                db.add_entry(...)
+                db.delete_entry(...)
+
+        Rolled back if the block raises. Blocks can be nested, only the
+        outermost one commits.
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        except Exception:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self.conn.rollback()
+            raise
+        self._transaction_depth -= 1
+        if not self._transaction_depth:
+            self.conn.commit()
+
+    def checkpoint(self):
+        """Copies the WAL content back into the main database file (no-op in rollback journal mode)."""
+        self.checkpoint_file(self.db_path)
+
+    @staticmethod
+    def checkpoint_file(db_path):
+        """
+        Checkpoints the WAL of db_path so the .db file alone holds every committed
+        write (needed before copying the raw file, e.g. for backups).
+        """
+        if not os.path.exists(db_path):
+            return
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        finally:
+            conn.close()
 
     def _create_tables(self):
         cursor = self.conn.cursor()
@@ -26,6 +140,9 @@ class DBManager:
                 value BLOB
             )
         """)
+        # Identity of this copy of the vault, recorded in backup manifests (see BackupManager)
+        import uuid
+        cursor.execute("INSERT OR IGNORE INTO metadata (key, value) VALUES ('vault_id', ?)", (str(uuid.uuid4()),))
         
         # Entries table: Stores the encrypted passwords
         cursor.execute("""
@@ -36,11 +153,244 @@ class DBManager:
                 username TEXT,
                 email TEXT,
                 ciphertext BLOB,
-                nonce BLOB
+                nonce BLOB,
+                modified_at REAL,
+                revision INTEGER DEFAULT 0
             )
         """)
         self.conn.commit()
 
+    def _create_search_index(self):
+        """
+        Creates the FTS5 index over the plaintext columns and the triggers that keep it
+        in sync with the entries table. Falls back to LIKE queries if FTS5 is unavailable.
+        """
+        columns = [name for name, _weight in self.SEARCH_COLUMNS]
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{name}" for name in columns)
+        old_values = ", ".join(f"old.{name}" for name in columns)
+
+        exists = self._has_table("entries_fts")
+        cursor = self.conn.cursor()
+
+        try:
+            # External content table: the text lives in 'entries', FTS only stores the index
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                    {column_list},
+                    content='entries', content_rowid='rowid',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 unavailable, search falls back to LIKE: {e}")
+            self.fts_enabled = False
+            return
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+                INSERT INTO entries_fts (rowid, {column_list}) VALUES (new.rowid, {new_values});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+                INSERT INTO entries_fts (entries_fts, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE OF {column_list} ON entries BEGIN
+                INSERT INTO entries_fts (entries_fts, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO entries_fts (rowid, {column_list}) VALUES (new.rowid, {new_values});
+            END
+        """)
+        self.conn.commit()
+        self.fts_enabled = True
+
+        if not exists:
+            # Existing vault: index the rows written before the FTS table existed
+            self.rebuild_search_index()
+
+    def rebuild_search_index(self):
+        """Rebuilds the FTS5 index from the entries table."""
+        if not self.fts_enabled:
+            return
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+        self.conn.commit()
+
+    def _create_changelog(self):
+        """
+        Change log used by incremental backups: every insert/update/delete of an
+        entry appends (revision, uuid, op). Revisions only ever increase
+        (AUTOINCREMENT), even after old rows are pruned.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS changelog (
+                rev INTEGER PRIMARY KEY AUTOINCREMENT,
+                uuid TEXT NOT NULL,
+                op TEXT NOT NULL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS changelog_uuid ON changelog (uuid, rev)")
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS changelog_insert AFTER INSERT ON entries BEGIN
+                INSERT INTO changelog (uuid, op) VALUES (new.uuid, 'upsert');
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS changelog_update AFTER UPDATE ON entries BEGIN
+                INSERT INTO changelog (uuid, op) VALUES (new.uuid, 'upsert');
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS changelog_delete AFTER DELETE ON entries BEGIN
+                INSERT INTO changelog (uuid, op) VALUES (old.uuid, 'delete');
+            END
+        """)
+
+        # Tombstones: lets a merge tell "deleted here" from "never existed here"
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS deleted_entries (
+                uuid TEXT PRIMARY KEY,
+                deleted_at REAL
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS deleted_entries_insert AFTER DELETE ON entries BEGIN
+                INSERT OR REPLACE INTO deleted_entries (uuid, deleted_at)
+                VALUES (old.uuid, (julianday('now') - 2440587.5) * 86400.0);
+            END
+        """)
+        self.conn.commit()
+
+    def get_meta(self, key: str, default=None):
+        """Reads a value from the metadata table."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT value FROM metadata WHERE key=?", (key,))
+        row = cursor.fetchone()
+        return row['value'] if row else default
+
+    def set_meta(self, key: str, value):
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value))
+        self._commit()
+
+    def get_entry_states(self) -> dict:
+        """uuid -> full entry row (ciphertext still encrypted), used by merge sync."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM entries")
+        return {row['uuid']: row for row in cursor.fetchall()}
+
+    def get_tombstones(self) -> dict:
+        """uuid -> deletion time (epoch seconds) of deleted entries."""
+        if not self._has_table("deleted_entries"):
+            return {}
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT uuid, deleted_at FROM deleted_entries")
+        return {row['uuid']: row['deleted_at'] for row in cursor.fetchall()}
+
+    def current_revision(self) -> int:
+        """Revision of the last change to the entries (0 if nothing was ever logged)."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name='changelog'")
+        row = cursor.fetchone()
+        return row['seq'] if row else 0
+
+    # Backup bookkeeping, not vault content (left out of content_fingerprint)
+    BOOKKEEPING_KEYS = ("changelog_pruned", "backup_base_id")
+
+    def content_fingerprint(self) -> dict:
+        """
+        Cheap fingerprint of the vault content, stored with backups to skip
+        unchanged ones: the change log revision (entries) and a hash of the
+        vault metadata (salt, verifier, vault_id, ...).
+        """
+        import hashlib
+        digest = hashlib.sha256()
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT key, value FROM metadata WHERE key NOT IN ({', '.join('?' * len(self.BOOKKEEPING_KEYS))}) "
+                       "ORDER BY key", self.BOOKKEEPING_KEYS)
+        for row in cursor.fetchall():
+            value = row['value']
+            digest.update(row['key'].encode() + b"\0")
+            digest.update(value if isinstance(value, bytes) else str(value).encode())
+            digest.update(b"\0")
+        return {"revision": self.current_revision(), "metadata": digest.hexdigest()}
+
+    def get_changes_since(self, revision: int) -> tuple[int, list]:
+        """
+        Returns (latest revision, changes) for everything changed after revision.
+        One change per uuid, its current state: a dict with the entry columns
+        (ciphertext still encrypted), or {"uuid", "deleted": True, "deleted_at"}.
+        Read in a single statement, so the result is a consistent snapshot.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT c.rev, c.uuid, e.uuid AS present, e.category, e.title, e.username, e.email,
+                   e.ciphertext, e.nonce, e.modified_at, e.revision, d.deleted_at
+            FROM changelog c LEFT JOIN entries e ON e.uuid = c.uuid
+                             LEFT JOIN deleted_entries d ON d.uuid = c.uuid
+            WHERE c.rev > ? AND c.rev = (SELECT MAX(rev) FROM changelog WHERE uuid = c.uuid)
+            ORDER BY c.rev
+        """, (revision,))
+        latest = revision
+        changes = []
+        for row in cursor.fetchall():
+            latest = max(latest, row['rev'])
+            if row['present'] is None:
+                changes.append({"uuid": row['uuid'], "deleted": True, "deleted_at": row['deleted_at']})
+            else:
+                changes.append({key: row[key] for key in
+                                ("uuid", "category", "title", "username", "email", "ciphertext", "nonce",
+                                 "modified_at", "revision")})
+        return latest, changes
+
+    def apply_changes(self, changes):
+        """Applies changes from get_changes_since (e.g. from a backup delta) as one transaction."""
+        with self.transaction():
+            cursor = self.conn.cursor()
+            for change in changes:
+                if change.get("deleted"):
+                    cursor.execute("DELETE FROM entries WHERE uuid=?", (change['uuid'],))
+                    if change.get("deleted_at") is not None:
+                        # The trigger stamped the tombstone with the replay time: a merge would
+                        # then drop edits made elsewhere after the actual deletion
+                        cursor.execute("INSERT OR REPLACE INTO deleted_entries (uuid, deleted_at) VALUES (?, ?)",
+                                       (change['uuid'], change['deleted_at']))
+                    continue
+                values = (change['category'], change['title'], change['username'], change['email'],
+                          change['ciphertext'], change['nonce'], change.get('modified_at'),
+                          change.get('revision') or 0, change['uuid'])
+                # Not INSERT OR REPLACE: its implicit delete would skip the FTS triggers
+                cursor.execute("""
+                    UPDATE entries SET category=?, title=?, username=?, email=?, ciphertext=?, nonce=?,
+                                       modified_at=?, revision=?
+                    WHERE uuid=?
+                """, values)
+                if not cursor.rowcount:
+                    cursor.execute("""
+                        INSERT INTO entries (category, title, username, email, ciphertext, nonce,
+                                             modified_at, revision, uuid)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, values)
+
+    def changelog_start(self) -> int:
+        """Changes after this revision are still in the change log (earlier ones were pruned)."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT value FROM metadata WHERE key='changelog_pruned'")
+        row = cursor.fetchone()
+        return int(row['value']) if row else 0
+
+    def prune_changelog(self, revision: int):
+        """Drops change log rows up to revision (already covered by a full backup)."""
+        if revision <= self.changelog_start():
+            return
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM changelog WHERE rev <= ?", (revision,))
+        cursor.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('changelog_pruned', ?)", (revision,))
+        self._commit()
+
     def _check_schema(self):
         """Checks for missing columns and adds them (Migration)."""
         cursor = self.conn.cursor()
@@ -52,57 +402,75 @@ class DBManager:
             cursor.execute("ALTER TABLE entries ADD COLUMN email TEXT")
             self.conn.commit()
 
+        # Per-entry change tracking for merge sync (see core/merge.py)
+        if 'modified_at' not in columns:
+            print("Migrating DB: Adding 'modified_at' and 'revision' columns...")
+            cursor.execute("ALTER TABLE entries ADD COLUMN modified_at REAL")
+            cursor.execute("ALTER TABLE entries ADD COLUMN revision INTEGER DEFAULT 0")
+            self.conn.commit()
+
+    def reset_vault_id(self):
+        """Gives this copy a new identity (e.g. after a restore made it a copy of another device's vault)."""
+        import uuid
+        self.set_meta('vault_id', str(uuid.uuid4()))
+
     def is_new_vault(self) -> bool:
         """Returns True if the vault has no master password set."""
+        if not self._has_table("metadata"):
+            return True # Brand new file, opened with ensure_schema=False
         cursor = self.conn.cursor()
         cursor.execute("SELECT 1 FROM metadata WHERE key='salt'")
         return cursor.fetchone() is None
 
-    def initialize_vault(self, password: str) -> tuple[bool, str]:
+    def initialize_vault(self, password: str, timer: PhaseTimer = None) -> tuple[bool, object]:
         """
         Sets up the vault with a new master password.
-        Returns (Success, ErrorMessage).
+        Returns (True, DerivedKey) or (False, ErrorMessage): the key is derived
+        once here, no verify_password needed after it.
+        timer (optional PhaseTimer) records the calibrate, kdf and write phases.
         """
+        timer = timer or PhaseTimer()
         try:
+            with timer.phase("calibrate"):
+                params = SecurityManager.calibrate_kdf()
             salt = SecurityManager.generate_salt()
-            key = SecurityManager.derive_key(password, salt)
+            with timer.phase("kdf"):
+                key = SecurityManager.derive_key(password, salt, params)
             verifier = SecurityManager.hash_key(key)
             
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", ('salt', salt))
-            cursor.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", ('verifier', verifier))
-            self.conn.commit()
-            return True, ""
+            with timer.phase("write"):
+                cursor = self.conn.cursor()
+                cursor.executemany("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+                                   [('salt', salt), ('verifier', verifier), ('kdf_params', json.dumps(params))])
+                self._commit()
+            return True, key
         except Exception as e:
             return False, str(e)
 
-    def verify_password(self, password: str) -> bytes:
+    def verify_password(self, password: str, timer: PhaseTimer = None) -> bytes:
         """
         Checks if the password is correct.
         Returns the Derived Key if correct, None otherwise.
+        Salt, verifier and KDF params are read in a single query.
+        timer (optional PhaseTimer) records the metadata, kdf and verify phases.
         """
+        timer = timer or PhaseTimer()
         try:
-            cursor = self.conn.cursor()
-            
-            # Get Salt
-            cursor.execute("SELECT value FROM metadata WHERE key='salt'")
-            salt_row = cursor.fetchone()
-            if not salt_row:
-                return None
-            salt = salt_row['value']
-            
-            # Get Verifier
-            cursor.execute("SELECT value FROM metadata WHERE key='verifier'")
-            verifier_row = cursor.fetchone()
-            if not verifier_row:
+            with timer.phase("metadata"):
+                cursor = self.conn.cursor()
+                cursor.execute("SELECT key, value FROM metadata WHERE key IN ('salt', 'verifier', 'kdf_params')")
+                meta = {row['key']: row['value'] for row in cursor.fetchall()}
+            if 'salt' not in meta or 'verifier' not in meta:
                 return None
-            stored_verifier = verifier_row['value']
+            params = json.loads(meta['kdf_params']) if meta.get('kdf_params') else dict(SecurityManager.LEGACY_KDF_PARAMS)
             
             # Derive Key and Check Hash
-            derived_key = SecurityManager.derive_key(password, salt)
-            computed_verifier = SecurityManager.hash_key(derived_key)
+            with timer.phase("kdf"):
+                derived_key = SecurityManager.derive_key(password, meta['salt'], params)
+            with timer.phase("verify"):
+                matches = hmac.compare_digest(SecurityManager.hash_key(derived_key), meta['verifier'])
             
-            if computed_verifier == stored_verifier:
+            if matches:
                 return derived_key
             else:
                 return None
@@ -110,9 +478,15 @@ class DBManager:
             print(f"Error verifying password: {e}")
             return None
 
-    def add_entry(self, encryption_key: bytes, category: str, title: str, username: str, email: str, password: str, note: str):
+    def get_kdf_params(self) -> dict:
+        """Argon2id parameters of the vault (LEGACY_KDF_PARAMS for vaults that predate them)."""
+        params = self.get_meta('kdf_params')
+        return json.loads(params) if params else dict(SecurityManager.LEGACY_KDF_PARAMS)
+
+    def add_entry(self, encryption_key: VaultCipher, category: str, title: str, username: str, email: str, password: str, note: str) -> str:
         """
         Encrypts the secret data (password + note) and saves it to the DB.
+        Returns the UUID of the new entry.
         """
         import uuid
         entry_uuid = str(uuid.uuid4())
@@ -128,10 +502,69 @@ class DBManager:
         
         cursor = self.conn.cursor()
         cursor.execute("""
-            INSERT INTO entries (uuid, category, title, username, email, ciphertext, nonce)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (entry_uuid, category, title, username, email, ciphertext, nonce))
-        self.conn.commit()
+            INSERT INTO entries (uuid, category, title, username, email, ciphertext, nonce, modified_at, revision)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
+        """, (entry_uuid, category, title, username, email, ciphertext, nonce, time.time()))
+        self._commit()
+        return entry_uuid
+
+    def add_entries_bulk(self, encryption_key: VaultCipher, entries, chunk_size: int = 500, commit_each_chunk: bool = False, progress=None) -> list:
+        """
+        Adds many entries at once (CSV import).
+        entries is any iterable of dicts with category/title/username/email/password/note;
+        rows are consumed chunk by chunk, each chunk is encrypted on the CryptoPool
+        and written with executemany.
+        By default everything is one transaction (all or nothing, a single fsync);
+        commit_each_chunk=True commits after every chunk instead.
+        progress(count) is called after each chunk with the number of rows written so far.
+        Returns the UUIDs of the new entries.
+        """
+        import uuid
+
+        sql = """
+            INSERT INTO entries (uuid, category, title, username, email, ciphertext, nonce, modified_at, revision)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
+        """
+        uuids = []
+        cursor = self.conn.cursor()
+
+        def write_chunk(chunk):
+            secrets_json = [json.dumps({
+                "password": entry.get('password', ""),
+                "note": entry.get('note', "")
+            }) for entry in chunk]
+            rows = []
+            for entry, (ok, result) in zip(chunk, SecurityManager.encrypt_many(secrets_json, encryption_key)):
+                if not ok:
+                    raise result
+                nonce, ciphertext = result
+                entry_uuid = str(uuid.uuid4())
+                rows.append((entry_uuid, entry.get('category', ""), entry.get('title', ""),
+                             entry.get('username', ""), entry.get('email', ""), ciphertext, nonce, time.time()))
+                uuids.append(entry_uuid)
+            cursor.executemany(sql, rows)
+
+        try:
+            chunk = []
+            for entry in entries:
+                chunk.append(entry)
+                if len(chunk) >= chunk_size:
+                    write_chunk(chunk)
+                    chunk = []
+                    if commit_each_chunk:
+                        self._commit()
+                    if progress:
+                        progress(len(uuids))
+
+            if chunk:
+                write_chunk(chunk)
+            self._commit()
+            if progress:
+                progress(len(uuids))
+        except Exception:
+            self.conn.rollback()
+            raise
+        return uuids
 
     def get_all_entries(self):
         """
@@ -141,14 +574,115 @@ class DBManager:
         cursor.execute("SELECT * FROM entries")
         return cursor.fetchall()
 
-    def delete_entry(self, uuid: str):
-        """Deletes an entry by UUID."""
+    def get_all_metadata(self):
+        """
+        Returns the plaintext columns of all entries (no ciphertext).
+        Used to build the card grid without decrypting anything.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT uuid, category, title, username, email FROM entries")
+        return cursor.fetchall()
+
+    def get_entry_metadata(self, uuid: str):
+        """Returns the plaintext columns of a single entry, or None."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT uuid, category, title, username, email FROM entries WHERE uuid=?", (uuid,))
+        return cursor.fetchone()
+
+    def get_secret(self, uuid: str, encryption_key: VaultCipher) -> dict:
+        """
+        Decrypts the secret payload (password + note) of a single entry.
+        Returns None if the entry does not exist.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT ciphertext, nonce FROM entries WHERE uuid=?", (uuid,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        decrypted_data = SecurityManager.decrypt(row['nonce'], row['ciphertext'], encryption_key)
+        return self.parse_secret(decrypted_data)
+
+    @staticmethod
+    def parse_secret(decrypted_data: str) -> dict:
+        """
+        Parses a decrypted payload into {"password", "note"}.
+        Legacy entries stored just the password as plain text.
+        """
+        try:
+            secret_obj = json.loads(decrypted_data)
+            return {
+                "password": secret_obj.get("password", ""),
+                "note": secret_obj.get("note", "")
+            }
+        except (json.JSONDecodeError, AttributeError):
+            return {"password": decrypted_data, "note": ""}
+
+    def search(self, query: str, category: str = None, limit: int = 50):
+        """
+        Searches the plaintext columns (title, category, username, email).
+        Every word of query must match the start of a word (prefix search),
+        results are ranked with bm25, title matches first.
+        If nothing matches, falls back to a substring search.
+        Returns metadata rows (no ciphertext).
+        """
+        words = re.findall(r"\w+", query.lower())
+        if not words:
+            return []
+
+        rows = []
+        if self.fts_enabled:
+            # Each word is quoted so FTS5 operators typed by the user are taken literally
+            match = " AND ".join(f'"{word}"*' for word in words)
+            weights = ", ".join(str(weight) for _name, weight in self.SEARCH_COLUMNS)
+            sql = f"""
+                SELECT e.uuid, e.category, e.title, e.username, e.email
+                FROM entries_fts JOIN entries e ON e.rowid = entries_fts.rowid
+                WHERE entries_fts MATCH ?
+            """
+            params = [match]
+            if category:
+                sql += " AND e.category = ? COLLATE NOCASE"
+                params.append(category)
+            sql += f" ORDER BY bm25(entries_fts, {weights}) LIMIT ?"
+            params.append(limit)
+
+            cursor = self.conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        if not rows:
+            rows = self._search_like(words, category, limit)
+        return rows
+
+    def _search_like(self, words, category, limit):
+        """Substring search without the FTS index (slow path)."""
+        columns = [name for name, _weight in self.SEARCH_COLUMNS]
+        clauses = []
+        params = []
+        for word in words:
+            clauses.append("(" + " OR ".join(f"{name} LIKE ? ESCAPE '\\'" for name in columns) + ")")
+            pattern = "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            params.extend([pattern] * len(columns))
+        sql = "SELECT uuid, category, title, username, email FROM entries WHERE " + " AND ".join(clauses)
+        if category:
+            sql += " AND category = ? COLLATE NOCASE"
+            params.append(category)
+        sql += " ORDER BY title COLLATE NOCASE LIMIT ?"
+        params.append(limit)
+
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+    def delete_entry(self, uuid: str) -> str:
+        """Deletes an entry by UUID. Returns the UUID if a row was removed, None otherwise."""
         cursor = self.conn.cursor()
         cursor.execute("DELETE FROM entries WHERE uuid=?", (uuid,))
-        self.conn.commit()
+        self._commit()
+        return uuid if cursor.rowcount else None
 
-    def update_entry(self, uuid: str, encryption_key: bytes, category: str, title: str, username: str, email: str, password: str, note: str):
-        """Updates an existing entry."""
+    def update_entry(self, uuid: str, encryption_key: VaultCipher, category: str, title: str, username: str, email: str, password: str, note: str) -> str:
+        """Updates an existing entry. Returns the UUID if a row was changed, None otherwise."""
         secret_payload = {
             "password": password,
             "note": note
@@ -160,14 +694,16 @@ class DBManager:
         cursor = self.conn.cursor()
         cursor.execute("""
             UPDATE entries 
-            SET category=?, title=?, username=?, email=?, ciphertext=?, nonce=?
+            SET category=?, title=?, username=?, email=?, ciphertext=?, nonce=?,
+                modified_at=?, revision=COALESCE(revision, 0) + 1
             WHERE uuid=?
-        """, (category, title, username, email, ciphertext, nonce, uuid))
-        self.conn.commit()
+        """, (category, title, username, email, ciphertext, nonce, time.time(), uuid))
+        self._commit()
+        return uuid if cursor.rowcount else None
 
     def delete_all(self):
         """For testing: Wipes the DB."""
         cursor = self.conn.cursor()
         cursor.execute("DELETE FROM metadata")
         cursor.execute("DELETE FROM entries")
-        self.conn.commit()
+        self._commit()
@@ -1,5 +1,10 @@
 import sys
 import time
+from core.timing import PhaseTimer
+
+# Startup timing report: import, DB open, KDF, first paint (printed once the window shows)
+startup = PhaseTimer("Startup")
+
 from PySide6.QtWidgets import QApplication, QDialog
 from PySide6.QtCore import QTimer
 from ui.splash_screen import PulsingSplashScreen
@@ -7,64 +12,78 @@ from ui.styles import DARK_THEME_QSS
 from core.utils import resource_path # Added import
 from PySide6.QtGui import QIcon
 
+startup.mark("import")
+
 # Global reference to keep the window alive
 main_window = None
 
 def main():
     global main_window
     app = QApplication(sys.argv)
-    app.setStyle("Fusion") 
+    app.setStyle("Fusion")
     app.setStyleSheet(DARK_THEME_QSS)
-    
+
     # Set Global Icon
     app.setWindowIcon(QIcon(resource_path("ironvault.ico")))
 
     splash = PulsingSplashScreen()
     splash.show()
     app.processEvents()
+    startup.mark("splash paint")
 
     def init_app():
         global main_window
-        splash.show_message("Loading Core Muscles...")
+        splash.show_message("Initializing Secure Vault...")
         app.processEvents()
-        
+
         # --- Defer Heavy Imports ---
-        # This allows the splash to show up INSTANTLY before Python loads completely
-        from ui.login_dialog import LoginDialog
-        from ui.main_window import MainWindow
-        from database.db_manager import DBManager
+        # Only what the login dialog needs; the main window and the Drive client
+        # (only if sync is set up) are imported by StartupWorker while the user types the password
+        with startup.phase("import login"):
+            from ui.login_dialog import LoginDialog
+            from ui.startup_worker import StartupWorker
+            from database.db_manager import DBManager
         # ---------------------------
 
-        splash.show_message("Initializing Secure Vault...")
-        app.processEvents()
-        
-        # Initialize Database
-        db_mgr = DBManager()
-        
-        splash.show_message("Verifying Integrity...")
-        app.processEvents()
-        time.sleep(0.5) # Small delay for UX 'weight'
-
-        splash.show_message("Ready.")
-        app.processEvents()
-        time.sleep(0.2)
+        # Open the vault without schema DDL, migrations run in the background
+        with startup.phase("db open"):
+            db_mgr = DBManager(ensure_schema=False)
 
         login = LoginDialog(db_mgr)
-        
-        # We can hide splash now, or after login success. 
-        # Standard desktop app behavior: Splash -> Login.
-        splash.finish(login) 
+        # Shown before finish(), which otherwise waits up to a second for it to be exposed
+        login.show()
+        splash.finish(login)
+        startup.mark("login shown")
+
+        prepare = StartupWorker(db_mgr.db_path)
+        prepare.start()
 
         if login.exec() == QDialog.Accepted:
             encryption_key = login.key
-            # Use global variable to prevent Garbage Collection
-            main_window = MainWindow(encryption_key, db_mgr)
-            main_window.show()
+            if login.unlock_timer is not None:
+                startup.add("kdf", login.unlock_timer.get("kdf", 0.0))
+
+            # Usually done long before the password is typed
+            wait_start = time.perf_counter()
+            prepare.wait()
+            startup.add("wait background", time.perf_counter() - wait_start)
+            for name, seconds in prepare.timer.phases.items():
+                startup.add(f"bg {name}", seconds)
+
+            from ui.main_window import MainWindow
+            with startup.phase("main window"):
+                # Use global variable to prevent Garbage Collection
+                main_window = MainWindow(encryption_key, db_mgr)
+                main_window.show()
+                app.processEvents()
+            startup.mark("first paint")
+            print(startup.report())
         else:
+            prepare.wait()
             sys.exit(0)
 
-    # Run init heavily AFTER the event loop has started and splash is painted
-    QTimer.singleShot(100, init_app)
+    # Run init AFTER the event loop has started and splash is painted
+    QTimer.singleShot(0, init_app)
 
     sys.exit(app.exec())
 
@@ -0,0 +1,74 @@
+"""
+Benchmark: full backup, incremental backup and restore of BackupManager against
+each storage backend that runs offline (core/storage.py): the local folder,
+the in-memory fake and Google Drive through tests/fake_drive.py.
+Reports time per operation and the bytes each backend received.
+
+Run from the repository root:  python scripts/bench_backup.py [entries]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.security import VaultCipher
+from core.backup_manager import BackupManager
+from core.storage import LocalStorage, MemoryStorage, DriveStorage
+from database.db_manager import DBManager
+
+def timed(label, func):
+    start = time.perf_counter()
+    success, msg = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<24} {elapsed * 1000:9.1f} ms  {'' if success else 'FAILED: ' + msg}")
+
+def backends(workdir):
+    yield "local", LocalStorage(os.path.join(workdir, "backups"))
+    yield "memory", MemoryStorage()
+    try:
+        from core.drive_sync import DriveSyncManager
+        from tests.fake_drive import FakeDriveService
+        drive = FakeDriveService()
+        yield "drive (fake)", DriveStorage(DriveSyncManager(service=drive, cache_file=None))
+    except ImportError as e:
+        print(f"Skipping Drive backend: {e}")
+
+def stored_bytes(storage):
+    return sum(f['size'] for f in storage.list())
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    workdir = tempfile.mkdtemp(prefix="ironvault_bench_")
+    os.makedirs(os.path.join(workdir, "backups"))
+    db_path = os.path.join(workdir, "vault.db")
+    cipher = VaultCipher(os.urandom(32))
+    try:
+        db = DBManager(db_path)
+        with db.transaction():
+            uuids = [db.add_entry(cipher, "Work", f"Site {i}", f"user{i}", "", f"pass{i}", "note " * 20)
+                     for i in range(count)]
+        db.conn.close()
+
+        for label, storage in backends(workdir):
+            print(f"--- {label} ({count} entries) ---")
+            manager = BackupManager(config_file=os.path.join(workdir, "none.json"), storage=storage)
+            timed("full backup", lambda: manager.backup_db(db_path, cipher))
+            timed("unchanged backup", lambda: manager.backup_db(db_path, cipher))
+
+            db = DBManager(db_path)
+            for uuid in uuids[:10]:
+                db.update_entry(uuid, cipher, "Work", "Renamed", "user", "", "new", "")
+            db.conn.close()
+            timed("incremental (10 edits)", lambda: manager.backup_incremental(db_path, cipher))
+
+            restored = os.path.join(workdir, "restored.db")
+            timed("restore", lambda: manager.restore_db(restored, cipher))
+            print(f"  {'stored':<24} {stored_bytes(storage) / 1024:9.1f} KiB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Micro-benchmark: per-entry AES-GCM cost with a fresh AESGCM per call
+(the old SecurityManager.encrypt/decrypt with raw key bytes) versus a
+reused VaultCipher.
+
+Run from the repository root:  python scripts/bench_cipher.py [entries]
+"""
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.security import SecurityManager, VaultCipher
+
+def bench(label, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed * 1e6 / count:8.2f} us/entry")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    key = os.urandom(32)
+    cipher = VaultCipher(key)
+    payload = json.dumps({"password": "correct horse battery staple", "note": "x" * 120})
+
+    print(f"--- AES-GCM per-entry cost ({count} entries) ---")
+    encrypted = [SecurityManager.encrypt(payload, key) for _ in range(count)]
+
+    bench("encrypt, new AESGCM per call", lambda: [SecurityManager.encrypt(payload, key) for _ in range(count)], count)
+    bench("encrypt, reused VaultCipher", lambda: [cipher.encrypt(payload) for _ in range(count)], count)
+    bench("encrypt_many (crypto pool)", lambda: SecurityManager.encrypt_many([payload] * count, cipher), count)
+
+    bench("decrypt, new AESGCM per call", lambda: [SecurityManager.decrypt(n, c, key) for n, c in encrypted], count)
+    bench("decrypt, reused VaultCipher", lambda: [cipher.decrypt(n, c) for n, c in encrypted], count)
+    bench("decrypt_many (crypto pool)", lambda: SecurityManager.decrypt_many(encrypted, cipher), count)
+
+if __name__ == "__main__":
+    main()
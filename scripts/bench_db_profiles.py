@@ -0,0 +1,84 @@
+"""
+Benchmark: add/update/delete throughput of DBManager for each connection
+profile (DBManager.PROFILES), one commit per operation and batched in a
+single transaction, plus reads from a second connection while writing.
+
+Run from the repository root:  python scripts/bench_db_profiles.py [entries]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.security import VaultCipher
+from database.db_manager import DBManager
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def report(label, elapsed, count):
+    print(f"  {label:<28} {count / elapsed:10.0f} ops/s")
+
+def run_profile(profile, count, cipher):
+    workdir = tempfile.mkdtemp(prefix="ironvault_bench_")
+    db_path = os.path.join(workdir, "vault.db")
+    try:
+        db = DBManager(db_path, profile=profile)
+        print(f"--- profile '{profile}' ({count} entries) ---")
+
+        uuids = []
+        add = lambda: uuids.extend(
+            db.add_entry(cipher, "Work", f"Site {i}", f"user{i}", f"u{i}@example.com", f"pass{i}", "")
+            for i in range(count))
+        report("add (commit each)", timed(add), count)
+
+        update = lambda: [db.update_entry(uuid, cipher, "Work", "Renamed", "user", "", "new", "")
+                          for uuid in uuids]
+        report("update (commit each)", timed(update), count)
+
+        delete = lambda: [db.delete_entry(uuid) for uuid in uuids]
+        report("delete (commit each)", timed(delete), count)
+
+        uuids = []
+        def add_batched():
+            with db.transaction():
+                add()
+        report("add (one transaction)", timed(add_batched), count)
+
+        # Reader on its own connection while the writer updates every entry
+        reads = [0]
+        done = threading.Event()
+        def reader():
+            reader_db = DBManager(db_path, profile=profile, read_only=True)
+            while not done.is_set():
+                try:
+                    reader_db.get_all_metadata()
+                    reads[0] += 1
+                except Exception: # "database is locked" in rollback journal mode
+                    pass
+            reader_db.conn.close()
+        thread = threading.Thread(target=reader)
+        thread.start()
+        elapsed = timed(update)
+        done.set()
+        thread.join()
+        report("update with reader", elapsed, count)
+        print(f"  {'concurrent full reads':<28} {reads[0] / elapsed:10.0f} reads/s")
+        db.conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cipher = VaultCipher(os.urandom(32))
+    for profile in DBManager.PROFILES:
+        run_profile(profile, count, cipher)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Argon2id calibration: the params SecurityManager.calibrate_kdf picks on this
+machine for a given unlock latency, and the time the legacy params take.
+
+Run from the repository root:  python scripts/bench_kdf.py [target_ms]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.security import SecurityManager
+
+def timed(params):
+    salt = SecurityManager.generate_salt()
+    start = time.perf_counter()
+    SecurityManager.derive_key("benchmark", salt, params)
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    target_ms = int(sys.argv[1]) if len(sys.argv) > 1 else SecurityManager.KDF_TARGET_MS
+    print(f"--- Argon2id calibration (target {target_ms} ms, {os.cpu_count()} cores) ---")
+    legacy = SecurityManager.LEGACY_KDF_PARAMS
+    print(f"legacy      {legacy}  {timed(legacy):7.1f} ms")
+
+    start = time.perf_counter()
+    params = SecurityManager.calibrate_kdf(target_ms)
+    calibration_ms = (time.perf_counter() - start) * 1000
+    print(f"calibrated  {params}  {timed(params):7.1f} ms  (calibration took {calibration_ms:.0f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+In-memory stand-in for the Drive v3 service used by DriveSyncManager, so sync
+code can be exercised without a Google account or network access:
+
+    drive = FakeDriveService()
+    manager = DriveSyncManager(service=drive, cache_file=None)
+
+Supports files().list/get/create/update/delete/get_media with resumable, chunked
+uploads (next_chunk, and session status queries to resume one) and ranged
+downloads (Range GETs on get_media); wrap the manager in core.storage.DriveStorage
+to run BackupManager against it.
+Set fail_after_chunks to simulate an interrupted upload or download.
+Used by tests/test_drive_sync.py and scripts/bench_backup.py.
+"""
+import hashlib
+import itertools
+from datetime import datetime, timezone
+
+
+class FakeNetworkError(ConnectionError):
+    pass
+
+
+class _Status:
+    def __init__(self, received, total):
+        self.resumable_progress = received
+        self.total_size = total
+
+    def progress(self):
+        return self.resumable_progress / self.total_size if self.total_size else 1.0
+
+
+class _Request:
+    """Mimics googleapiclient.http.HttpRequest (execute, and next_chunk for uploads)."""
+    def __init__(self, drive, action, media=None):
+        self.drive = drive
+        self.action = action
+        self.media = media
+        self.http = _UploadHttp(drive)
+        self.resumable_uri = None
+        self.resumable_progress = 0
+
+    def execute(self, num_retries=0):
+        if self.media is not None:
+            response = None
+            while response is None:
+                _status, response = self.next_chunk()
+            return response
+        return self.action(None)
+
+    def next_chunk(self, num_retries=0):
+        drive = self.drive
+        size = self.media.size()
+        if self.resumable_uri is None:
+            self.resumable_uri = f"fake://upload/{next(drive._ids)}"
+            drive.sessions[self.resumable_uri] = bytearray()
+
+        drive._count_chunk()
+
+        chunk = self.media.getbytes(self.resumable_progress, self.media.chunksize())
+        drive.sessions[self.resumable_uri] += chunk
+        drive.uploaded_bytes += len(chunk)
+        self.resumable_progress += len(chunk)
+        if self.resumable_progress < size:
+            return _Status(self.resumable_progress, size), None
+
+        data = bytes(drive.sessions.pop(self.resumable_uri))
+        return None, self.action(data)
+
+
+class _Response(dict):
+    """httplib2.Response look-alike: headers dict with a status."""
+    def __init__(self, status, headers):
+        super().__init__(headers)
+        self.status = status
+
+
+class _UploadHttp:
+    """Answers upload session status queries (empty PUT with "Content-Range: bytes */<size>")."""
+    def __init__(self, drive):
+        self.drive = drive
+
+    def request(self, uri, method="GET", headers=None, **kwargs):
+        self.drive.calls.append("session status")
+        if method != "PUT" or uri not in self.drive.sessions:
+            return _Response(404, {}), b"Not Found"
+        received = len(self.drive.sessions[uri])
+        headers = {"range": f"bytes=0-{received - 1}"} if received else {}
+        return _Response(308, headers), b""
+
+
+class _MediaHttp:
+    """Serves Range requests for get_media, as sent by DriveSyncManager.download_file."""
+    def __init__(self, drive, file_id):
+        self.drive = drive
+        self.file_id = file_id
+
+    def request(self, uri, method="GET", headers=None, **kwargs):
+        data = self.drive.stored[self.file_id]['data']
+        start, end = 0, len(data) - 1
+        if headers and "range" in headers:
+            first, last = headers["range"].split("=", 1)[1].split("-")
+            start, end = int(first), min(int(last), len(data) - 1)
+        if start >= len(data):
+            return _Response(416, {"content-range": f"bytes */{len(data)}"}), b""
+        self.drive._count_chunk()
+        content = data[start:end + 1]
+        self.drive.downloaded_bytes += len(content)
+        return _Response(206, {"content-range": f"bytes {start}-{end}/{len(data)}"}), content
+
+
+class _MediaRequest:
+    def __init__(self, drive, file_id):
+        self.uri = f"fake://media/{file_id}"
+        self.headers = {}
+        self.http = _MediaHttp(drive, file_id)
+
+
+class _Files:
+    def __init__(self, drive):
+        self.drive = drive
+
+    def list(self, q="", pageSize=100, fields=None, pageToken=None, orderBy=None):
+        def action(_data):
+            name = prefix = None
+            if "name = '" in q:
+                name = q.split("name = '", 1)[1].split("'", 1)[0]
+            if "name contains '" in q:
+                prefix = q.split("name contains '", 1)[1].split("'", 1)[0]
+            files = [self.drive._public(f) for f in self.drive.stored.values()
+                     if (name is None or f['name'] == name) and (prefix is None or prefix in f['name'])]
+            if orderBy == "modifiedTime desc":
+                files.sort(key=lambda f: f['modifiedTime'], reverse=True)
+            start = int(pageToken or 0)
+            page = files[start:start + pageSize]
+            result = {'files': page}
+            if start + pageSize < len(files):
+                result['nextPageToken'] = str(start + pageSize)
+            return result
+        self.drive.calls.append("list")
+        return _Request(self.drive, action)
+
+    def get(self, fileId, fields=None):
+        def action(_data):
+            if fileId not in self.drive.stored:
+                raise FileNotFoundError(fileId)
+            return self.drive._public(self.drive.stored[fileId])
+        self.drive.calls.append("get")
+        return _Request(self.drive, action)
+
+    def create(self, body, media_body=None, fields=None):
+        def action(data):
+            file_id = f"file{next(self.drive._ids)}"
+            self.drive.stored[file_id] = {'id': file_id, 'name': body['name']}
+            return self.drive._store(file_id, data)
+        self.drive.calls.append("create")
+        return _Request(self.drive, action, media_body)
+
+    def update(self, fileId, media_body=None, body=None, fields=None):
+        def action(data):
+            return self.drive._store(fileId, data)
+        self.drive.calls.append("update")
+        return _Request(self.drive, action, media_body)
+
+    def get_media(self, fileId):
+        if fileId not in self.drive.stored:
+            raise FileNotFoundError(fileId)
+        self.drive.calls.append("get_media")
+        return _MediaRequest(self.drive, fileId)
+
+    def delete(self, fileId):
+        def action(_data):
+            self.drive.stored.pop(fileId, None)
+        self.drive.calls.append("delete")
+        return _Request(self.drive, action)
+
+
+class FakeDriveService:
+    def __init__(self):
+        self.stored = {}   # id -> {'id', 'name', 'data', 'md5Checksum', 'modifiedTime'}
+        self.sessions = {} # resumable uri -> bytes received so far
+        self.calls = []    # API methods called, in order
+        self.uploaded_bytes = 0
+        self.downloaded_bytes = 0
+        self.fail_after_chunks = None
+        self._ids = itertools.count(1)
+
+    def files(self):
+        return _Files(self)
+
+    def _count_chunk(self):
+        if self.fail_after_chunks is not None:
+            if self.fail_after_chunks <= 0:
+                raise FakeNetworkError("Simulated network failure")
+            self.fail_after_chunks -= 1
+
+    def _store(self, file_id, data):
+        entry = self.stored[file_id]
+        entry['data'] = data
+        entry['md5Checksum'] = hashlib.md5(data).hexdigest()
+        entry['size'] = str(len(data))
+        entry['modifiedTime'] = datetime.now(timezone.utc).isoformat()
+        return self._public(entry)
+
+    @staticmethod
+    def _public(entry):
+        return {key: value for key, value in entry.items() if key != 'data'}
+
@@ -0,0 +1,107 @@
+"""BackupFormat (core/backup_format.py): chunked stream round trip, tamper and truncation detection, legacy blobs."""
+import io
+import os
+import pytest
+
+from core.backup_format import BackupFormat
+from core.backup_manager import BackupManager
+from core.security import SecurityManager, VaultCipher
+from core.storage import MemoryStorage
+from database.db_manager import DBManager
+
+KEY = bytes(range(32))
+CHUNK = 1024
+
+def encrypt(data, chunk_size=CHUNK, key=KEY):
+    dst = io.BytesIO()
+    written = BackupFormat.encrypt_stream(key, io.BytesIO(data), dst, chunk_size=chunk_size)
+    assert written == len(data)
+    return dst.getvalue()
+
+def decrypt(blob, key=KEY):
+    dst = io.BytesIO()
+    BackupFormat.decrypt_stream(key, io.BytesIO(blob), dst)
+    return dst.getvalue()
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK - 1, CHUNK, CHUNK + 1, 5 * CHUNK + 17])
+def test_round_trip(size):
+    data = os.urandom(size)
+    assert decrypt(encrypt(data)) == data
+
+def test_accepts_a_cipher_as_key():
+    data = os.urandom(3 * CHUNK)
+    assert decrypt(encrypt(data, key=VaultCipher(KEY))) == data
+
+@pytest.mark.parametrize("cut", [1, BackupFormat._header.size, BackupFormat._header.size + 2])
+def test_truncated_file_fails(cut):
+    blob = encrypt(os.urandom(3 * CHUNK))
+    with pytest.raises(ValueError):
+        decrypt(blob[:cut])
+
+def test_dropped_last_segment_fails():
+    # Cut exactly at a segment boundary: only the authenticated trailer is missing
+    blob = encrypt(os.urandom(3 * CHUNK + 10))
+    segment = BackupFormat._length.size + CHUNK + BackupFormat.TAG_SIZE
+    with pytest.raises(ValueError, match="truncated"):
+        decrypt(blob[:BackupFormat._header.size + 3 * segment])
+
+def test_tampered_or_wrong_key_fails():
+    blob = bytearray(encrypt(os.urandom(2 * CHUNK)))
+    blob[-1] ^= 1
+    with pytest.raises(ValueError, match="corrupted"):
+        decrypt(bytes(blob))
+    with pytest.raises(ValueError, match="corrupted"):
+        decrypt(encrypt(b"secret"), key=os.urandom(32))
+
+def test_trailing_data_fails():
+    with pytest.raises(ValueError, match="Unexpected data"):
+        decrypt(encrypt(os.urandom(CHUNK)) + b"x")
+
+def test_is_chunked(tmp_path):
+    chunked = tmp_path / "vault.enc"
+    chunked.write_bytes(encrypt(b"data"))
+    nonce, ciphertext = VaultCipher(KEY).encrypt_bytes(b"data")
+    legacy = tmp_path / "legacy.enc"
+    legacy.write_bytes(nonce + ciphertext)
+    assert BackupFormat.is_chunked(str(chunked))
+    assert not BackupFormat.is_chunked(str(legacy))
+
+def test_reads_legacy_blob():
+    data = os.urandom(2 * CHUNK)
+    nonce, ciphertext = VaultCipher(KEY).encrypt_bytes(data)
+    assert BackupFormat.decrypt_legacy(KEY, nonce + ciphertext) == data
+    with pytest.raises(Exception):
+        BackupFormat.decrypt_legacy(os.urandom(32), nonce + ciphertext)
+
+def make_vault(path):
+    db = DBManager(str(path))
+    db.set_meta('verifier', SecurityManager.hash_key(KEY))
+    db.add_entry(VaultCipher(KEY), "Work", "Mail", "me", "", "pass", "")
+    db.checkpoint()
+    db.conn.close()
+    return str(path)
+
+def test_backups_are_written_chunked(tmp_path):
+    storage = MemoryStorage()
+    manager = BackupManager(config_file=str(tmp_path / "backup_config.json"), storage=storage)
+    assert manager.backup_db(make_vault(tmp_path / "vault.db"), VaultCipher(KEY))[0]
+    stored = tmp_path / "vault.enc"
+    stored.write_bytes(storage.get_bytes("vault.enc"))
+    assert BackupFormat.is_chunked(str(stored))
+    assert decrypt(stored.read_bytes()).startswith(b"SQLite format 3\0")
+
+def test_restores_a_legacy_backup(tmp_path):
+    # vault.enc as written before the chunked format: nonce + one AES-GCM ciphertext
+    with open(make_vault(tmp_path / "vault.db"), 'rb') as f:
+        nonce, ciphertext = VaultCipher(KEY).encrypt_bytes(f.read())
+    storage = MemoryStorage()
+    storage.put_bytes("vault.enc", nonce + ciphertext)
+    manager = BackupManager(config_file=str(tmp_path / "backup_config.json"), storage=storage)
+
+    restored = str(tmp_path / "restored.db")
+    assert manager.restore_db(restored, VaultCipher(KEY))[0]
+    db = DBManager(restored)
+    try:
+        assert [row['title'] for row in db.get_all_metadata()] == ["Mail"]
+    finally:
+        db.conn.close()
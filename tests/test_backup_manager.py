@@ -0,0 +1,213 @@
+"""BackupManager (core/backup_manager.py) against the in-memory storage backend: full, incremental, retention and restore."""
+import os
+import time
+import pytest
+
+from core.backup_manager import BackupManager
+from core.security import SecurityManager, VaultCipher
+from core.storage import MemoryStorage, mirror
+from database.db_manager import DBManager
+
+KEY = bytes(range(32))
+
+@pytest.fixture
+def cipher():
+    return VaultCipher(KEY)
+
+@pytest.fixture
+def storage():
+    return MemoryStorage()
+
+@pytest.fixture
+def manager(tmp_path, storage):
+    return BackupManager(config_file=str(tmp_path / "backup_config.json"), storage=storage)
+
+def make_vault(path, cipher, titles=()):
+    db = DBManager(str(path))
+    db.set_meta('verifier', SecurityManager.hash_key(KEY))
+    uuids = [db.add_entry(cipher, "Work", title, "me", "", f"{title}-pass", "") for title in titles]
+    db.conn.close()
+    return str(path), uuids
+
+def edit(db_path, change):
+    db = DBManager(db_path)
+    try:
+        return change(db)
+    finally:
+        db.conn.close()
+
+def titles(db_path):
+    return edit(db_path, lambda db: sorted(row['title'] for row in db.get_all_metadata()))
+
+def test_full_backup_and_restore(tmp_path, manager, storage, cipher):
+    db_path, _ = make_vault(tmp_path / "vault.db", cipher, ["e1", "e2"])
+    success, _msg = manager.backup_db(db_path, cipher)
+    assert success
+    assert {"vault.enc", BackupManager.MANIFEST_FILE} <= set(storage.files)
+
+    restored = str(tmp_path / "restored.db")
+    success, _msg = manager.restore_db(restored, cipher)
+    assert success
+    assert titles(restored) == ["e1", "e2"]
+    assert not [name for name in os.listdir(tmp_path) if "snapshot" in name], "Temp files left behind"
+
+def test_unchanged_vault_is_not_written_again(tmp_path, manager, storage, cipher):
+    db_path, _ = make_vault(tmp_path / "vault.db", cipher, ["e1"])
+    manager.backup_db(db_path, cipher)
+    written = storage.bytes_written
+    assert manager.backup_db(db_path, cipher) == (True, "Backup is up to date.")
+    assert manager.backup_incremental(db_path, cipher) == (True, "Backup is up to date.")
+    assert storage.bytes_written == written
+
+def test_incremental_backup_writes_a_delta(tmp_path, manager, storage, cipher):
+    db_path, (first, second) = make_vault(tmp_path / "vault.db", cipher, ["e1", "e2"])
+    manager.backup_db(db_path, cipher)
+    base = storage.files["vault.enc"]
+
+    edit(db_path, lambda db: db.update_entry(first, cipher, "Work", "e1 renamed", "me", "", "new", ""))
+    edit(db_path, lambda db: db.delete_entry(second))
+    edit(db_path, lambda db: db.add_entry(cipher, "Work", "e3", "me", "", "pass", ""))
+    success, msg = manager.backup_incremental(db_path, cipher)
+    assert success and "Incremental" in msg
+    assert storage.files["vault.enc"] == base, "Snapshot rewritten"
+    assert [name for name in storage.files if name.startswith("vault.delta.")]
+
+    restored = str(tmp_path / "restored.db")
+    success, msg = manager.restore_db(restored, cipher)
+    assert success and "1 incremental" in msg
+    assert titles(restored) == ["e1 renamed", "e3"]
+    assert edit(restored, lambda db: db.get_secret(first, cipher))['password'] == "new"
+
+def test_restore_keeps_the_deltas_for_other_devices(tmp_path, manager, storage, cipher):
+    db_path, (uuid,) = make_vault(tmp_path / "vault.db", cipher, ["e1"])
+    manager.backup_db(db_path, cipher)
+    edit(db_path, lambda db: db.update_entry(uuid, cipher, "Work", "e1 renamed", "me", "", "pass", ""))
+    manager.backup_incremental(db_path, cipher)
+
+    for device in ("b.db", "c.db"):
+        restored = str(tmp_path / device)
+        success, msg = manager.restore_db(restored, cipher)
+        assert success and "1 incremental" in msg
+        assert titles(restored) == ["e1 renamed"]
+
+    # The restored copy does not own the snapshot: its next backup is a full one
+    edit(restored, lambda db: db.add_entry(cipher, "Work", "e2", "me", "", "pass", ""))
+    success, msg = manager.backup_incremental(restored, cipher)
+    assert success and "Incremental" not in msg
+
+def test_deltas_are_compacted(tmp_path, manager, storage, cipher, monkeypatch):
+    monkeypatch.setattr(BackupManager, "COMPACT_AFTER", 2)
+    monkeypatch.setattr(BackupManager, "COMPACT_RATIO", 100)
+    db_path, (uuid,) = make_vault(tmp_path / "vault.db", cipher, ["e1"])
+    manager.backup_db(db_path, cipher)
+    for i in range(3):
+        edit(db_path, lambda db: db.update_entry(uuid, cipher, "Work", f"e1 v{i}", "me", "", "pass", ""))
+        manager.backup_incremental(db_path, cipher)
+    # Third change: two deltas already, written as a new full snapshot
+    assert not [name for name in storage.files if name.startswith("vault.delta.")]
+    assert titles(db_path) == ["e1 v2"]
+
+def test_incremental_on_another_devices_snapshot_is_a_full_backup(tmp_path, manager, storage, cipher):
+    # Two copies of the vault share the backup folder
+    device_a, _ = make_vault(tmp_path / "a.db", cipher, ["e1"])
+    manager.backup_db(device_a, cipher)
+    device_b = str(tmp_path / "b.db")
+    manager.restore_db(device_b, cipher)
+    edit(device_b, lambda db: [db.add_entry(cipher, "Work", t, "me", "", "pass", "") for t in ("e2", "e3")])
+    manager.backup_db(device_b, cipher)
+
+    edit(device_a, lambda db: [db.add_entry(cipher, "Work", t, "me", "", "pass", "") for t in ("e4", "e5", "e6")])
+    success, msg = manager.backup_incremental(device_a, cipher)
+    assert success and "Incremental" not in msg
+
+    restored = str(tmp_path / "restored.db")
+    manager.restore_db(restored, cipher)
+    assert titles(restored) == ["e1", "e4", "e5", "e6"]
+
+def test_versions_and_retention(tmp_path, manager, storage, cipher, monkeypatch):
+    monkeypatch.setattr(BackupManager, "KEEP_LAST", 2)
+    monkeypatch.setattr(BackupManager, "KEEP_DAILY", 0)
+    monkeypatch.setattr(BackupManager, "KEEP_WEEKLY", 0)
+    # One backup an hour (version names have a one second resolution)
+    now = [time.time() - 10 * 3600]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+
+    db_path, _ = make_vault(tmp_path / "vault.db", cipher)
+    for i in range(4):
+        edit(db_path, lambda db: db.add_entry(cipher, "Work", f"e{i}", "me", "", "pass", ""))
+        assert manager.backup_db(db_path, cipher)[0]
+        now[0] += 3600
+
+    versions = manager.list_versions(cipher)
+    assert [v['entries'] for v in versions] == [4, 3]
+    stored = [name for name in storage.files if name.startswith("versions/")]
+    assert sorted(stored) == sorted(["versions/index.enc"] + [f"versions/{v['file']}" for v in versions])
+
+    restored = str(tmp_path / "restored.db")
+    success, _msg = manager.restore_db(restored, cipher, versions[1]['file'])
+    assert success
+    assert titles(restored) == ["e0", "e1", "e2"]
+    assert not manager.restore_db(restored, cipher, "vault-19990101-000000.enc")[0]
+
+def test_retention_policy():
+    day = 24 * 3600
+    # One version a day going back from Saturday 2026-01-31
+    start = time.mktime((2026, 1, 31, 12, 0, 0, 0, 0, -1))
+    versions = [{"file": f"v{i}", "created": start - i * day} for i in range(60)]
+    keep = BackupManager._retained(versions)
+    # The last 10 (covering the 7 daily ones), then the newest of each of the
+    # 4 last ISO weeks: Sundays 01-25 (v6), 01-18 (v13) and 01-11 (v20)
+    assert keep == {f"v{i}" for i in range(10)} | {"v13", "v20"}
+
+def test_failed_write_keeps_the_previous_backup(tmp_path, manager, storage, cipher):
+    db_path, (uuid,) = make_vault(tmp_path / "vault.db", cipher, ["e1"])
+    manager.backup_db(db_path, cipher)
+    edit(db_path, lambda db: db.update_entry(uuid, cipher, "Work", "e1 renamed", "me", "", "pass", ""))
+    storage.fail_puts = 1
+    success, msg = manager.backup_db(db_path, cipher)
+    assert not success and "Simulated" in msg
+
+    restored = str(tmp_path / "restored.db")
+    assert manager.restore_db(restored, cipher)[0]
+    assert titles(restored) == ["e1"]
+
+def test_merge_from_backup(tmp_path, manager, cipher):
+    db_path, _ = make_vault(tmp_path / "vault.db", cipher, ["e1"])
+    other, _ = make_vault(tmp_path / "other.db", cipher, ["e2"])
+    manager.backup_db(other, cipher)
+    success, msg = manager.merge_db(db_path, cipher)
+    assert success and "1 added" in msg
+    assert titles(db_path) == ["e1", "e2"]
+
+def test_backup_files_is_the_encrypted_set(tmp_path, manager, storage, cipher):
+    db_path, (uuid,) = make_vault(tmp_path / "vault.db", cipher, ["e1"])
+    manager.backup_db(db_path, cipher)
+    edit(db_path, lambda db: db.update_entry(uuid, cipher, "Work", "e1 renamed", "me", "", "pass", ""))
+    manager.backup_incremental(db_path, cipher)
+    for name in ("vault.db", "vault.db-wal", "vault.db-shm"):
+        storage.put_bytes(name, b"plaintext")
+
+    names = manager.backup_files()
+    assert {"vault.enc", BackupManager.MANIFEST_FILE, "versions/index.enc"} <= set(names)
+    assert any(name.startswith("vault.delta.") for name in names)
+    assert not [name for name in names if name.startswith("vault.db")]
+
+def test_mirror_removes_files_gone_from_the_backup(tmp_path, manager, storage, cipher, monkeypatch):
+    monkeypatch.setattr(BackupManager, "COMPACT_AFTER", 1)
+    db_path, (uuid,) = make_vault(tmp_path / "vault.db", cipher, ["e1"])
+    manager.backup_db(db_path, cipher)
+    edit(db_path, lambda db: db.update_entry(uuid, cipher, "Work", "e1 renamed", "me", "", "pass", ""))
+    manager.backup_incremental(db_path, cipher)
+    copy = MemoryStorage()
+    copy.put_bytes("notes.txt", b"not part of the backup")
+    mirror(storage, copy, names=set(manager.backup_files()), prune=BackupManager.PRUNED_PREFIXES)
+    delta = next(name for name in copy.files if name.startswith("vault.delta."))
+
+    # Compacted into a new snapshot: the delta is gone from the backup folder
+    edit(db_path, lambda db: db.update_entry(uuid, cipher, "Work", "e1 v2", "me", "", "pass", ""))
+    manager.backup_incremental(db_path, cipher)
+    _copied, _skipped, deleted = mirror(storage, copy, names=set(manager.backup_files()),
+                                        prune=BackupManager.PRUNED_PREFIXES)
+    assert deleted == 1 and delta not in copy.files
+    assert "notes.txt" in copy.files
+    assert {name for name in copy.files if name != "notes.txt"} == set(manager.backup_files())
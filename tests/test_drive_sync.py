@@ -0,0 +1,165 @@
+"""DriveSyncManager (core/drive_sync.py) and DriveStorage against the in-memory FakeDriveService."""
+import os
+import pytest
+
+# Uploads go through googleapiclient's MediaFileUpload, even against the fake service
+pytest.importorskip("googleapiclient")
+
+from core.drive_sync import DriveSyncManager
+from core.storage import DriveStorage
+from tests.fake_drive import FakeDriveService
+
+CHUNK = 256 * 1024
+
+@pytest.fixture
+def drive():
+    return FakeDriveService()
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / "drive_cache.json")
+
+@pytest.fixture
+def manager(drive, cache_file):
+    return DriveSyncManager(service=drive, cache_file=cache_file)
+
+def write_random(path, size=3 * CHUNK + 100):
+    data = os.urandom(size)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return data
+
+def test_upload_and_skip_unchanged(tmp_path, manager, drive):
+    path = str(tmp_path / "vault.enc")
+    data = write_random(path)
+    success, msg = manager.upload_file(path, chunk_size=CHUNK)
+    assert success and "Created" in msg
+    sent = drive.uploaded_bytes
+
+    success, msg = manager.upload_file(path, chunk_size=CHUNK)
+    assert success and "up to date" in msg
+    assert drive.uploaded_bytes == sent
+    assert [f['data'] for f in drive.stored.values()] == [data]
+
+def test_known_file_is_found_by_id(tmp_path, manager, drive, cache_file):
+    path = str(tmp_path / "vault.enc")
+    write_random(path)
+    manager.upload_file(path, chunk_size=CHUNK)
+    write_random(path)
+
+    # New manager: the file ID comes from the cache file, no files().list search
+    del drive.calls[:]
+    success, msg = DriveSyncManager(service=drive, cache_file=cache_file).upload_file(path, chunk_size=CHUNK)
+    assert success and "Updated" in msg
+    assert "list" not in drive.calls and drive.calls[0] == "get"
+    assert len(drive.stored) == 1
+
+def test_interrupted_upload_resumes(tmp_path, manager, drive, cache_file):
+    path = str(tmp_path / "vault.enc")
+    write_random(path)
+    manager.upload_file(path, chunk_size=CHUNK)
+    data = write_random(path)
+
+    drive.fail_after_chunks = 2
+    success, _msg = manager.upload_file(path, chunk_size=CHUNK)
+    assert not success
+    drive.fail_after_chunks = None
+
+    # New manager: the session is picked up from the cache file
+    before = drive.uploaded_bytes
+    success, msg = DriveSyncManager(service=drive, cache_file=cache_file).upload_file(path, chunk_size=CHUNK)
+    assert success and "Updated" in msg
+    assert drive.calls.count("session status") == 1, "Offset not asked before resuming"
+    assert drive.uploaded_bytes - before == len(data) - 2 * CHUNK
+    assert [f['data'] for f in drive.stored.values()] == [data], "Duplicate or wrong remote file"
+
+def test_expired_upload_session_starts_over(tmp_path, manager, drive):
+    path = str(tmp_path / "vault.enc")
+    data = write_random(path)
+    drive.fail_after_chunks = 1
+    assert not manager.upload_file(path, chunk_size=CHUNK)[0]
+    drive.fail_after_chunks = None
+    drive.sessions.clear() # Expired on the server
+
+    assert not manager.upload_file(path, chunk_size=CHUNK)[0]
+    success, msg = manager.upload_file(path, chunk_size=CHUNK)
+    assert success and "Created" in msg
+    assert [f['data'] for f in drive.stored.values()] == [data]
+
+def test_interrupted_download_resumes(tmp_path, manager, drive):
+    path = str(tmp_path / "vault.enc")
+    data = write_random(path)
+    manager.upload_file(path, chunk_size=CHUNK)
+    file_id = next(iter(drive.stored))
+    target = str(tmp_path / "restored.enc")
+
+    drive.fail_after_chunks = 1
+    success, _msg = manager.download_file(file_id, target, chunk_size=CHUNK, num_retries=0)
+    assert not success
+    assert os.path.getsize(target + ".part") == CHUNK
+    drive.fail_after_chunks = None
+
+    before = drive.downloaded_bytes
+    progress = []
+    success, _msg = manager.download_file(file_id, target, chunk_size=CHUNK,
+                                          progress=lambda done, total: progress.append(done))
+    assert success
+    assert drive.downloaded_bytes - before == len(data) - CHUNK
+    assert progress[-1] == len(data)
+    with open(target, 'rb') as f:
+        assert f.read() == data
+    assert not os.path.exists(target + ".part"), "Partial file left behind"
+
+def test_failed_download_keeps_the_destination(tmp_path, manager, drive):
+    path = str(tmp_path / "vault.enc")
+    write_random(path)
+    manager.upload_file(path, chunk_size=CHUNK)
+    target = tmp_path / "restored.enc"
+    target.write_bytes(b"previous copy")
+
+    drive.fail_after_chunks = 2
+    success, _msg = manager.download_file(next(iter(drive.stored)), str(target), chunk_size=CHUNK, num_retries=0)
+    assert not success
+    assert target.read_bytes() == b"previous copy", "Destination replaced by a partial download"
+
+def test_download_of_an_empty_file(tmp_path, manager, drive):
+    path = str(tmp_path / "empty.enc")
+    write_random(path, 0)
+    manager.upload_file(path)
+    target = tmp_path / "restored.enc"
+    assert manager.download_file(next(iter(drive.stored)), str(target))[0]
+    assert target.read_bytes() == b""
+    assert drive.downloaded_bytes == 0
+
+def test_stale_partial_download_is_replaced(tmp_path, manager, drive):
+    path = str(tmp_path / "vault.enc")
+    data = write_random(path)
+    manager.upload_file(path, chunk_size=CHUNK)
+    target = str(tmp_path / "restored.enc")
+    with open(target + ".part", 'wb') as f:
+        f.write(b"x" * 1000) # Left by a download of an older version
+
+    assert manager.download_file(next(iter(drive.stored)), target, chunk_size=CHUNK)[0]
+    with open(target, 'rb') as f:
+        assert f.read() == data
+
+def test_list_follows_pages(tmp_path, manager):
+    for i in range(6):
+        path = str(tmp_path / f"vault-2026010{i}-120000.enc")
+        write_random(path, 100)
+        manager.upload_file(path)
+    listed = manager.list_backups(page_size=2)
+    assert len(listed) == 6, "Paging lost files"
+
+def test_drive_storage(manager, drive):
+    storage = DriveStorage(manager)
+    storage.put_bytes("versions/index.enc", b"index")
+    assert storage.get_bytes("versions/index.enc") == b"index"
+    assert [f['name'] for f in storage.list("versions/")] == ["versions/index.enc"]
+    assert storage.stat("versions/index.enc")['size'] == 5
+
+    storage.delete("versions/index.enc")
+    assert storage.stat("versions/index.enc") is None
+    assert drive.calls.count("delete") == 1
+    with pytest.raises(FileNotFoundError):
+        storage.get_bytes("versions/index.enc")
@@ -0,0 +1,57 @@
+"""
+Import-time regression check: the cold start (everything imported before the
+login dialog shows, plus the main window) must not pull in the Google client
+stack, and the main window must add only a few modules on top of the cold start.
+
+Each check imports in a fresh interpreter.
+Run with pytest, or directly:  python -m tests.test_import_budget
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Loaded only once Drive sync is used (see core/drive_sync.py)
+HEAVY_PREFIXES = ("googleapiclient", "google_auth_oauthlib", "google_auth_httplib2", "google.auth",
+                  "google.oauth2", "google.api_core", "httplib2", "oauthlib", "requests_oauthlib")
+
+COLD_START = ("main", "ui.login_dialog", "ui.startup_worker", "database.db_manager")
+MAIN_WINDOW = ("ui.main_window", "core.drive_sync", "ui.drive_sync_service")
+
+# Modules the main window may add over the cold start (about 25 measured; the
+# Google stack alone adds several hundred). Relative, so it does not depend on
+# how many modules Python and PySide6 load themselves.
+MAIN_WINDOW_EXTRA_BUDGET = 80
+
+def loaded_modules(*imports):
+    """Names of the modules loaded after importing the given modules in a new interpreter."""
+    code = "import sys, json\n" + "".join(f"import {name}\n" for name in imports) + \
+        "print(json.dumps(sorted(sys.modules)))"
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def heavy(modules):
+    return [name for name in modules if name.startswith(HEAVY_PREFIXES)]
+
+def test_cold_start_import_set():
+    modules = loaded_modules(*COLD_START)
+    assert not heavy(modules), f"Google client imported at startup: {heavy(modules)[:5]}"
+
+def test_main_window_does_not_import_drive_client():
+    modules = loaded_modules(*COLD_START, *MAIN_WINDOW)
+    assert not heavy(modules), f"Google client imported by the main window: {heavy(modules)[:5]}"
+    extra = set(modules) - set(loaded_modules(*COLD_START))
+    assert len(extra) <= MAIN_WINDOW_EXTRA_BUDGET, \
+        f"Main window adds {len(extra)} modules over the cold start (budget {MAIN_WINDOW_EXTRA_BUDGET})"
+
+def main():
+    for test in (test_cold_start_import_set, test_main_window_does_not_import_drive_client):
+        test()
+        print(f"{test.__name__}: OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""VaultMerger (core/merge.py): entry by entry merge of two copies of a vault."""
+import itertools
+import os
+import shutil
+import time
+import pytest
+
+from core.backup_manager import BackupManager
+from core.merge import VaultMerger
+from core.security import SecurityManager, VaultCipher
+from core.storage import MemoryStorage
+from database.db_manager import DBManager
+
+KEY = bytes(range(32))
+
+@pytest.fixture
+def cipher():
+    return VaultCipher(KEY)
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Every time.time() call is one second later, so edits are strictly ordered.
+    Starts in the past: deletions are stamped by SQLite's own clock (tombstone trigger).
+    """
+    ticks = itertools.count(1_700_000_000)
+    monkeypatch.setattr(time, "time", lambda: float(next(ticks)))
+
+@pytest.fixture
+def vaults(tmp_path, cipher, clock):
+    """(local, remote, uuid): two copies of a vault holding one entry."""
+    local = DBManager(str(tmp_path / "local.db"))
+    local.set_meta('verifier', SecurityManager.hash_key(KEY))
+    uuid = local.add_entry(cipher, "Work", "Mail", "me", "", "pass1", "")
+    local.checkpoint()
+    shutil.copy(local.db_path, tmp_path / "remote.db")
+    remote = DBManager(str(tmp_path / "remote.db"))
+    yield local, remote, uuid
+    local.conn.close()
+    remote.conn.close()
+
+def titles(db):
+    return sorted(row['title'] for row in db.get_all_metadata())
+
+def password(db, uuid, cipher):
+    return db.get_secret(uuid, cipher)['password']
+
+def test_remote_only_changes_are_applied(vaults, cipher):
+    local, remote, uuid = vaults
+    VaultMerger(local).merge(remote) # Baseline
+    added = remote.add_entry(cipher, "Work", "Bank", "me", "", "pass2", "")
+    remote.update_entry(uuid, cipher, "Work", "Mail", "me", "", "changed", "")
+
+    counts = VaultMerger(local).merge(remote)
+    assert counts['added'] == 1 and counts['updated'] == 1 and counts['conflicts'] == 0
+    assert titles(local) == ["Bank", "Mail"]
+    assert password(local, uuid, cipher) == "changed"
+    assert password(local, added, cipher) == "pass2"
+
+def test_local_changes_are_kept(vaults, cipher):
+    local, remote, uuid = vaults
+    VaultMerger(local).merge(remote)
+    local.update_entry(uuid, cipher, "Work", "Mail", "me", "", "mine", "")
+
+    counts = VaultMerger(local).merge(remote)
+    assert counts['updated'] == 0 and counts['conflicts'] == 0
+    assert password(local, uuid, cipher) == "mine"
+
+def test_edits_on_both_sides_keep_a_conflict_copy(vaults, cipher):
+    local, remote, uuid = vaults
+    VaultMerger(local).merge(remote)
+    local.update_entry(uuid, cipher, "Work", "Mail (here)", "me", "", "mine", "")
+    remote.update_entry(uuid, cipher, "Work", "Mail (there)", "me", "", "theirs", "")
+
+    counts = VaultMerger(local).merge(remote)
+    assert counts['conflicts'] == 1
+    assert titles(local) == ["Mail (here) (conflict copy)", "Mail (there)"]
+    # Merging again does not add another copy
+    VaultMerger(local).merge(remote)
+    assert len(titles(local)) == 2
+
+def test_first_merge_treats_differences_as_conflicts(vaults, cipher):
+    # No last_merge_at yet: nothing tells which side changed, both versions are kept
+    local, remote, uuid = vaults
+    local.update_entry(uuid, cipher, "Work", "Mail", "me", "", "mine", "")
+    remote.update_entry(uuid, cipher, "Work", "Mail", "me", "", "theirs", "")
+
+    counts = VaultMerger(local).merge(remote)
+    assert counts['conflicts'] == 1 and counts['updated'] == 0
+    secrets = sorted(password(local, row['uuid'], cipher) for row in local.get_all_metadata())
+    assert secrets == ["mine", "theirs"]
+
+def test_lww_keeps_the_newest_only(vaults, cipher):
+    local, remote, uuid = vaults
+    local.update_entry(uuid, cipher, "Work", "Mail", "me", "", "mine", "")
+    remote.update_entry(uuid, cipher, "Work", "Mail", "me", "", "theirs", "")
+
+    counts = VaultMerger(local, "lww").merge(remote)
+    assert counts['updated'] == 1 and counts['conflicts'] == 0
+    assert titles(local) == ["Mail"]
+    assert password(local, uuid, cipher) == "theirs"
+
+def test_deletions_follow_tombstones(vaults, cipher):
+    local, remote, uuid = vaults
+    VaultMerger(local).merge(remote)
+    remote.delete_entry(uuid)
+    assert VaultMerger(local).merge(remote)['deleted'] == 1
+    assert titles(local) == []
+
+    # Deleted here: not brought back by the other copy
+    readded = remote.add_entry(cipher, "Work", "Wiki", "me", "", "pass3", "")
+    VaultMerger(local).merge(remote)
+    local.delete_entry(readded)
+    assert VaultMerger(local).merge(remote)['added'] == 0
+    assert titles(local) == []
+
+def test_edit_after_a_deletion_in_a_delta_is_kept(tmp_path, vaults, cipher):
+    local, remote, uuid = vaults
+    VaultMerger(local).merge(remote)
+    manager = BackupManager(config_file=str(tmp_path / "backup_config.json"), storage=MemoryStorage())
+    manager.backup_db(remote.db_path, cipher)
+    remote.delete_entry(uuid)
+    # Stamp the deletion with the test clock (the trigger uses SQLite's)
+    with remote.transaction():
+        remote.conn.execute("UPDATE deleted_entries SET deleted_at=? WHERE uuid=?", (time.time(), uuid))
+    success, msg = manager.backup_incremental(remote.db_path, cipher)
+    assert success and "Incremental" in msg
+
+    # Edited here after the deletion: replaying the delta must not date the deletion later
+    local.update_entry(uuid, cipher, "Work", "Mail", "me", "", "mine", "")
+    success, msg = manager.merge_db(local.db_path, cipher, local_db=local)
+    assert success and "0 deleted" in msg
+    assert password(local, uuid, cipher) == "mine"
+
+def test_only_changed_entries_are_written(vaults, cipher):
+    local, remote, uuid = vaults
+    local.add_entry(cipher, "Work", "Bank", "me", "", "pass2", "")
+    VaultMerger(local).merge(remote)
+    revision = local.current_revision()
+    assert VaultMerger(local).merge(remote)['unchanged'] == 2
+    assert local.current_revision() == revision, "Unchanged entries rewritten"
+
+    remote.update_entry(uuid, cipher, "Work", "Mail", "me", "", "changed", "")
+    VaultMerger(local).merge(remote)
+    _latest, changed = local.get_changes_since(revision)
+    assert [change['uuid'] for change in changed] == [uuid]
+
+def test_plan_writes_nothing(vaults, cipher):
+    local, remote, uuid = vaults
+    remote.add_entry(cipher, "Work", "Bank", "me", "", "pass2", "")
+    changes, counts = VaultMerger(local).plan(remote)
+    assert len(changes) == 1 and counts['added'] == 1
+    assert titles(local) == ["Mail"]
+    assert local.get_meta(VaultMerger.LAST_MERGE_KEY) is None
+
+def test_different_key_is_refused(vaults):
+    local, remote, _uuid = vaults
+    remote.set_meta('verifier', SecurityManager.hash_key(os.urandom(32)))
+    with pytest.raises(ValueError):
+        VaultMerger(local).merge(remote)
+
+def test_unknown_strategy(vaults):
+    with pytest.raises(ValueError):
+        VaultMerger(vaults[0], "newest")
@@ -0,0 +1,332 @@
+from PySide6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PySide6.QtCore import Qt, Signal, QAbstractListModel, QSortFilterProxyModel, QModelIndex, QRect, QSize
+from PySide6.QtGui import QColor, QFont, QPainter, QPen
+
+# Custom roles exposed by EntryListModel
+UuidRole = Qt.UserRole + 1
+EntryRole = Qt.UserRole + 2
+
+CARD_WIDTH = 220
+CARD_HEIGHT = 180
+
+
+class EntryListModel(QAbstractListModel):
+    """
+    Flat list model over the plaintext metadata of every entry.
+    Rows are plain dicts (uuid, title, category, username, email), no secrets.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries = []
+        self._rows = {} # uuid -> row
+
+    @staticmethod
+    def _to_entry(row):
+        # row is a sqlite3.Row (or dict) with the metadata columns
+        return {
+            "uuid": row['uuid'],
+            "title": row['title'] or "",
+            "category": row['category'] or "",
+            "username": row['username'] or "",
+            "email": row['email'] or ""
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+        entry = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return entry['title']
+        if role == UuidRole:
+            return entry['uuid']
+        if role == EntryRole:
+            return entry
+        return None
+
+    def entry(self, uuid):
+        row = self._rows.get(uuid)
+        if row is None:
+            return None
+        return self._entries[row]
+
+    def entry_at(self, row):
+        return self._entries[row]
+
+    def set_entries(self, rows):
+        self.beginResetModel()
+        self._entries = [self._to_entry(row) for row in rows]
+        self._rows = {entry['uuid']: i for i, entry in enumerate(self._entries)}
+        self.endResetModel()
+
+    def insert_entry(self, row):
+        """Appends a new entry, or updates it in place if the uuid is already known."""
+        entry = self._to_entry(row)
+        if entry['uuid'] in self._rows:
+            return self.update_entry(row)
+        position = len(self._entries)
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._entries.append(entry)
+        self._rows[entry['uuid']] = position
+        self.endInsertRows()
+
+    def update_entry(self, row):
+        entry = self._to_entry(row)
+        position = self._rows.get(entry['uuid'])
+        if position is None:
+            return self.insert_entry(row)
+        self._entries[position] = entry
+        index = self.index(position)
+        self.dataChanged.emit(index, index)
+
+    def remove_entry(self, uuid):
+        position = self._rows.get(uuid)
+        if position is None:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position)
+        self._entries.pop(position)
+        del self._rows[uuid]
+        for i in range(position, len(self._entries)):
+            self._rows[self._entries[i]['uuid']] = i
+        self.endRemoveRows()
+
+
+class EntryFilterProxy(QSortFilterProxyModel):
+    """
+    Filters and orders the cards from the uuids ranked by the SearchIndex,
+    and optionally restricts them to one category.
+    Without a search the source (insertion) order is kept.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ranks = None # uuid -> rank, None means no search filter
+        self._category = None
+
+    def set_search_results(self, ranked_uuids, ranked=True):
+        """
+        Shows only ranked_uuids (None shows everything).
+        With ranked=False the matches keep the source order, which avoids
+        sorting very large result sets.
+        """
+        if ranked_uuids is None and self._ranks is None:
+            return
+        self._ranks = None if ranked_uuids is None else {uuid: i for i, uuid in enumerate(ranked_uuids)}
+        # Filter in source order first, then sort only the (small) ranked set
+        self.sort(-1)
+        self.invalidateFilter()
+        if ranked and self._ranks is not None:
+            self.sort(0)
+
+    def set_category(self, category):
+        self._category = category.lower() if category else None
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        entry = self.sourceModel().entry_at(source_row)
+        if self._category is not None and entry['category'].lower() != self._category:
+            return False
+        return self._ranks is None or entry['uuid'] in self._ranks
+
+    def lessThan(self, left, right):
+        if self._ranks is not None:
+            model = self.sourceModel()
+            left_rank = self._ranks.get(model.entry_at(left.row())['uuid'], len(self._ranks))
+            right_rank = self._ranks.get(model.entry_at(right.row())['uuid'], len(self._ranks))
+            if left_rank != right_rank:
+                return left_rank < right_rank
+        return left.row() < right.row()
+
+
+class CardDelegate(QStyledItemDelegate):
+    """
+    Paints an entry as a card (same look as the old PasswordCard widget).
+    No widget exists per entry: the view only paints the rows that are visible.
+    """
+    # (action, label, hover color)
+    BUTTONS = [
+        ("copy", "Copy Pwd", "#7f5af0"),
+        ("edit", "Edit", "#2cb67d"),
+        ("delete", "Del", "#ef476f"),
+    ]
+    MARGIN = 15
+    BUTTON_HEIGHT = 24
+    BUTTON_SPACING = 5
+
+    def sizeHint(self, option, index):
+        return QSize(CARD_WIDTH, CARD_HEIGHT)
+
+    def card_rect(self, item_rect):
+        return QRect(item_rect.x(), item_rect.y(), CARD_WIDTH, CARD_HEIGHT)
+
+    def button_rects(self, item_rect):
+        card = self.card_rect(item_rect)
+        width = (CARD_WIDTH - 2 * self.MARGIN - (len(self.BUTTONS) - 1) * self.BUTTON_SPACING) // len(self.BUTTONS)
+        top = card.bottom() - self.MARGIN - self.BUTTON_HEIGHT
+        rects = []
+        x = card.x() + self.MARGIN
+        for action, label, color in self.BUTTONS:
+            rects.append((action, label, color, QRect(x, top, width, self.BUTTON_HEIGHT)))
+            x += width + self.BUTTON_SPACING
+        return rects
+
+    def action_at(self, item_rect, pos):
+        """Returns the action name of the button under pos, or None."""
+        for action, _label, _color, rect in self.button_rects(item_rect):
+            if rect.contains(pos):
+                return action
+        return None
+
+    def paint(self, painter, option, index):
+        entry = index.data(EntryRole)
+        if not entry:
+            return
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        view = option.widget
+        hover_pos = getattr(view, "hover_pos", None) if hovered else None
+
+        # Card background
+        card = self.card_rect(option.rect).adjusted(0, 0, -1, -1)
+        painter.setPen(QPen(QColor("#7f5af0" if hovered else "#333333"), 1))
+        painter.setBrush(QColor("#2d2d2d" if hovered else "#252526"))
+        painter.drawRoundedRect(card, 6, 6)
+
+        inner_width = CARD_WIDTH - 2 * self.MARGIN
+        x = card.x() + self.MARGIN
+        y = card.y() + self.MARGIN + 4
+
+        # Title
+        font = QFont(option.font)
+        font.setPixelSize(14)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("#ffffff"))
+        metrics = painter.fontMetrics()
+        title = metrics.elidedText(entry['title'], Qt.ElideRight, inner_width)
+        painter.drawText(QRect(x, y, inner_width, metrics.height()), Qt.AlignLeft | Qt.AlignVCenter, title)
+        y += metrics.height() + 5
+
+        # Category Badge
+        font.setPixelSize(11)
+        font.setBold(False)
+        font.setWeight(QFont.Medium)
+        painter.setFont(font)
+        metrics = painter.fontMetrics()
+        category = metrics.elidedText(entry['category'].upper(), Qt.ElideRight, inner_width - 12)
+        badge = QRect(x, y, metrics.horizontalAdvance(category) + 12, metrics.height() + 4)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#1e1e1e"))
+        painter.drawRoundedRect(badge, 8, 8)
+        painter.setPen(QColor("#858585"))
+        painter.drawText(badge, Qt.AlignCenter, category)
+        y += badge.height() + 5
+
+        # Username/Email
+        font.setPixelSize(12)
+        font.setWeight(QFont.Normal)
+        painter.setFont(font)
+        painter.setPen(QColor("#aaaaaa"))
+        metrics = painter.fontMetrics()
+        for prefix, key in (("👤", "username"), ("📧", "email")):
+            if entry[key]:
+                text = metrics.elidedText(f"{prefix} {entry[key]}", Qt.ElideRight, inner_width)
+                painter.drawText(QRect(x, y, inner_width, metrics.height()), Qt.AlignLeft | Qt.AlignVCenter, text)
+                y += metrics.height() + 2
+
+        # Buttons
+        font.setPixelSize(11)
+        painter.setFont(font)
+        for _action, label, color, rect in self.button_rects(option.rect):
+            if hover_pos is not None and rect.contains(hover_pos):
+                painter.setPen(QPen(QColor(color), 1))
+                painter.setBrush(QColor(color))
+                text_color = QColor("#ffffff")
+            else:
+                painter.setPen(QPen(QColor("#444444"), 1))
+                painter.setBrush(QColor("#333333"))
+                text_color = QColor("#cccccc")
+            painter.drawRoundedRect(rect, 4, 4)
+            painter.setPen(text_color)
+            painter.drawText(rect, Qt.AlignCenter, label)
+
+        painter.restore()
+
+
+class CardListView(QListView):
+    """
+    Virtualized card grid: a QListView in icon mode painted by CardDelegate.
+    Emits the uuid of the card whose Copy/Edit/Del button was clicked.
+    """
+    copyRequested = Signal(str) # Emit uuid
+    editRequested = Signal(str) # Emit uuid
+    deleteRequested = Signal(str) # Emit uuid
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hover_pos = None
+        self._hover_index = QModelIndex()
+
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        self.setSpacing(10)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)
+        self.setStyleSheet("QListView { border: none; background-color: #1e1e1e; }")
+
+        self.setItemDelegate(CardDelegate(self))
+
+    def _update_hover(self, index):
+        # Only repaint the cards whose hover state changed
+        if self._hover_index.isValid():
+            self.viewport().update(self.visualRect(self._hover_index))
+        self._hover_index = index
+        if index.isValid():
+            self.viewport().update(self.visualRect(index))
+
+    def mouseMoveEvent(self, event):
+        self.hover_pos = event.position().toPoint()
+        index = self.indexAt(self.hover_pos)
+        self._update_hover(index)
+
+        action = None
+        if index.isValid():
+            action = self.itemDelegate().action_at(self.visualRect(index), self.hover_pos)
+        self.viewport().setCursor(Qt.PointingHandCursor if action else Qt.ArrowCursor)
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self.hover_pos = None
+        self._update_hover(QModelIndex())
+        super().leaveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        action, uuid = None, None
+        if event.button() == Qt.LeftButton:
+            pos = event.position().toPoint()
+            index = self.indexAt(pos)
+            if index.isValid():
+                action = self.itemDelegate().action_at(self.visualRect(index), pos)
+                uuid = index.data(UuidRole)
+        super().mouseReleaseEvent(event)
+
+        # Emitted last: the handlers may open dialogs or remove the row
+        if action == "copy":
+            self.copyRequested.emit(uuid)
+        elif action == "edit":
+            self.editRequested.emit(uuid)
+        elif action == "delete":
+            self.deleteRequested.emit(uuid)
@@ -0,0 +1,183 @@
+import random
+import time
+import itertools
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+from core.storage import LocalStorage, DriveStorage, mirror
+
+def create_drive_manager():
+    # Imported here so the Google client libraries load on the worker thread
+    from core.drive_sync import DriveSyncManager
+    return DriveSyncManager()
+
+class DriveSyncWorker(QObject):
+    """
+    Runs DriveSyncManager calls on a background thread.
+    The manager (authenticated Drive service and its HTTP connection) is created
+    once and reused by every request. Requests are processed in order.
+    """
+    finished = Signal(int, object) # Emit request_id, (success_bool, result_or_error)
+    status = Signal(str)
+
+    # Whole-operation retries on network errors (HTTP retries are done by DriveSyncManager)
+    MAX_ATTEMPTS = 4
+    BACKOFF_SECONDS = 2.0
+
+    def __init__(self, manager_factory=None):
+        super().__init__()
+        self.manager_factory = manager_factory
+        self.manager = None
+        self.superseded = set() # request ids replaced by a newer upload of the same file
+
+    def _manager(self):
+        if self.manager is None:
+            self.manager = (self.manager_factory or create_drive_manager)()
+        if self.manager.service is None:
+            self.status.emit("Connecting to Google Drive...")
+            success, msg = self.manager.authenticate()
+            if not success:
+                raise ConnectionError(msg)
+        return self.manager
+
+    def _with_backoff(self, op, func):
+        for attempt in range(self.MAX_ATTEMPTS):
+            try:
+                return func(self._manager())
+            except FileNotFoundError:
+                raise # Missing credentials.json or local file, retrying won't help
+            except (ConnectionError, TimeoutError, OSError) as e:
+                if attempt + 1 == self.MAX_ATTEMPTS:
+                    raise
+                delay = self.BACKOFF_SECONDS * 2 ** attempt * (1 + random.random())
+                self.status.emit(f"Drive {op} failed ({e}), retrying in {delay:.0f}s...")
+                time.sleep(delay)
+
+    @Slot(int, str, object)
+    def handle(self, request_id, op, args):
+        if request_id in self.superseded:
+            self.superseded.discard(request_id)
+            self.finished.emit(request_id, (True, "Skipped, superseded by a newer upload."))
+            return
+        try:
+            handler = getattr(self, f"op_{op}")
+            result = self._with_backoff(op, lambda manager: handler(manager, *args))
+            self.finished.emit(request_id, (True, result))
+        except Exception as e:
+            print(f"Drive sync: '{op}' failed: {e}")
+            self.finished.emit(request_id, (False, str(e)))
+
+    @Slot()
+    def close(self):
+        QThread.currentThread().quit()
+
+    # --- Operations (run on the worker thread) ---
+    # DriveSyncManager reports failures as (False, message), turned into exceptions here.
+
+    @staticmethod
+    def _check(result):
+        success, msg = result
+        if not success:
+            raise ConnectionError(msg)
+        return msg
+
+    def op_authenticate(self, manager):
+        return "Connected to Google Drive."
+
+    def op_upload(self, manager, file_path, file_name=None):
+        self.status.emit(f"Uploading {file_name or file_path}...")
+        return self._check(manager.upload_file(file_path, file_name))
+
+    def op_download(self, manager, file_id, destination_path):
+        self.status.emit("Downloading from Google Drive...")
+        return self._check(manager.download_file(file_id, destination_path))
+
+    def op_list_backups(self, manager):
+        return manager.list_backups()
+
+    def op_mirror(self, manager, backup_path, names, prune=()):
+        self.status.emit("Copying backups to Google Drive...")
+        copied, skipped, deleted = mirror(LocalStorage(backup_path), DriveStorage(manager),
+                                          names=set(names), prune=prune)
+        return f"Google Drive: {copied} files uploaded, {skipped} up to date, {deleted} removed."
+
+
+class DriveSyncService(QObject):
+    """
+    GUI-thread front of DriveSyncWorker, same request/callback API as VaultClient.
+    Uploads (and mirrors) of a file that is already queued replace the queued
+    one, so a burst of backups results in a single upload of the latest file.
+    """
+    requested = Signal(int, str, object)
+    closeRequested = Signal()
+    status = Signal(str)
+
+    def __init__(self, manager_factory=None, parent=None):
+        super().__init__(parent)
+        self._ids = itertools.count(1)
+        self._callbacks = {}
+        self._queued_uploads = {} # file name (or mirror key) -> request id not started yet
+
+        self.thread = QThread()
+        self.worker = DriveSyncWorker(manager_factory)
+        self.worker.moveToThread(self.thread)
+
+        self.requested.connect(self.worker.handle)
+        self.closeRequested.connect(self.worker.close)
+        self.worker.finished.connect(self._on_finished)
+        self.worker.status.connect(self.status)
+        self.thread.finished.connect(self.worker.deleteLater)
+
+        self.thread.start()
+
+    @property
+    def pending(self):
+        """Number of requests sent but not answered yet."""
+        return len(self._callbacks)
+
+    def request(self, op, *args, on_done=None, on_error=None) -> int:
+        request_id = next(self._ids)
+        self._callbacks[request_id] = (on_done, on_error)
+        self.requested.emit(request_id, op, args)
+        return request_id
+
+    def _request_latest(self, key, op, *args, on_done=None, on_error=None) -> int:
+        # A queued request with the same key is skipped in favour of this one
+        previous = self._queued_uploads.get(key)
+        if previous is not None:
+            self.worker.superseded.add(previous)
+        request_id = self.request(op, *args, on_done=on_done, on_error=on_error)
+        self._queued_uploads[key] = request_id
+        return request_id
+
+    def upload(self, file_path, file_name, on_done=None, on_error=None) -> int:
+        return self._request_latest(file_name, "upload", file_path, file_name, on_done=on_done, on_error=on_error)
+
+    def mirror(self, backup_path, names, prune=(), on_done=None, on_error=None) -> int:
+        """
+        Copies the backup set (names, see BackupManager.backup_files) from the backup
+        folder to Drive, and removes the Drive files under the prune prefixes gone from it.
+        """
+        return self._request_latest(f"mirror:{backup_path}", "mirror", backup_path, list(names), tuple(prune),
+                                    on_done=on_done, on_error=on_error)
+
+    def _on_finished(self, request_id, result):
+        for name, queued_id in list(self._queued_uploads.items()):
+            if queued_id == request_id:
+                del self._queued_uploads[name]
+        self.worker.superseded.discard(request_id)
+        on_done, on_error = self._callbacks.pop(request_id, (None, None))
+        success, data = result
+        if success:
+            self.status.emit(data if isinstance(data, str) else "Google Drive is up to date.")
+            if on_done:
+                on_done(data)
+        else:
+            self.status.emit(f"Google Drive sync failed: {data}")
+            if on_error:
+                on_error(data)
+
+    def shutdown(self):
+        """Lets the queued requests finish and stops the thread."""
+        if self.thread.isFinished():
+            return
+        self.closeRequested.emit()
+        self.thread.wait()
@@ -3,6 +3,7 @@ from PySide6.QtGui import QIcon
 from core.utils import resource_path
 from PySide6.QtCore import Qt, Signal, QThread, QObject
 from database.db_manager import DBManager
+from core.timing import PhaseTimer
 
 class LoginWorker(QObject):
     finished = Signal(object) # Emit (success_bool, result_or_error)
@@ -12,25 +13,27 @@ class LoginWorker(QObject):
         self.db_path = db_path
         self.password = password
         self.is_new_vault = is_new_vault
+        self.timer = None
 
     def run(self):
+        timer = self.timer = PhaseTimer("Unlock")
         # Create a thread-local DBManager
-        # SQLite connections cannot be shared across threads
-        local_db = DBManager(self.db_path)
+        # SQLite connections cannot be shared across threads.
+        # The schema is already set up by the app's own connection, only a new vault needs it here.
+        with timer.phase("open"):
+            local_db = DBManager(self.db_path, ensure_schema=self.is_new_vault)
         
         try:
             if self.is_new_vault:
-                # Initialize
-                success, error = local_db.initialize_vault(self.password)
+                # Initialize (returns the key, no second derivation to log in)
+                success, result = local_db.initialize_vault(self.password, timer)
                 if success:
-                    # Auto-login
-                    derived_key = local_db.verify_password(self.password)
-                    self.finished.emit((True, derived_key))
+                    self.finished.emit((True, result))
                 else:
-                    self.finished.emit((False, f"Failed to create vault: {error}"))
+                    self.finished.emit((False, f"Failed to create vault: {result}"))
             else:
                 # Login
-                derived_key = local_db.verify_password(self.password)
+                derived_key = local_db.verify_password(self.password, timer)
                 if derived_key:
                     self.finished.emit((True, derived_key))
                 else:
@@ -38,6 +41,7 @@ class LoginWorker(QObject):
         except Exception as e:
             self.finished.emit((False, str(e)))
         finally:
+            print(timer.report())
             # Explicitly close to be safe, though GC handles it
             if local_db.conn:
                 local_db.conn.close()
@@ -56,6 +60,7 @@ class LoginDialog(QDialog):
 
         self.is_new_vault = self.db_manager.is_new_vault()
         self.key = None
+        self.unlock_timer = None # PhaseTimer of the last unlock attempt
 
         # Main Layout Container
         self.container = QWidget(self)
@@ -193,6 +198,7 @@ class LoginDialog(QDialog):
 
     def on_login_finished(self, result):
         success, data = result
+        self.unlock_timer = self.worker.timer
         
         # Restore UI State
         self.password_input.setEnabled(True)
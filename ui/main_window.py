@@ -1,185 +1,63 @@
-from PySide6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, 
-                               QListWidget, QListWidgetItem, QLineEdit, 
-                               QScrollArea, QGridLayout, QLabel, QFrame, QPushButton, QMessageBox, QMenu, QMenuBar, QFileDialog, QInputDialog)
-from PySide6.QtCore import Qt,  Signal
-from PySide6.QtGui import QIcon, QClipboard, QGuiApplication, QAction
+from PySide6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QLineEdit,
+                               QLabel, QFrame, QPushButton, QMessageBox, QFileDialog, QProgressDialog)
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QIcon, QGuiApplication, QAction
 from ui.add_entry_dialog import AddEntryDialog
+from ui.edit_entry_dialog import EditEntryDialog
 from ui.settings_dialog import SettingsDialog
-
-
-from core.security import SecurityManager
-from core.backup_manager import BackupManager # Changed import
-import json
-import csv
-import os
-from PySide6.QtCore import QThread, Signal # Added imports
-
-class PasswordCard(QFrame):
-    copyRequested = Signal(object) # Emit (ciphertext, nonce)
-    deleteRequested = Signal(str) # Emit uuid
-    editRequested = Signal(object) # Emit full entry data
-
-    def __init__(self, uuid, title, category, username, email, ciphertext, nonce, password, note):
-        super().__init__()
-        self.uuid = uuid
-        self.ciphertext = ciphertext
-        self.nonce = nonce
-        self.full_data = {
-            "uuid": uuid,
-            "title": title,
-            "category": category,
-            "username": username,
-            "email": email,
-            "ciphertext": ciphertext,
-            "nonce": nonce,
-            "password": password,
-            "note": note
-        }
-
-        self.setObjectName("PasswordCard")
-        # Dynamic height based on content? Fixed for now, but slightly taller.
-        self.setFixedSize(220, 180) 
-        
-        # Layout
-        layout = QVBoxLayout()
-        layout.setContentsMargins(15, 15, 15, 15)
-        layout.setSpacing(5)
-        
-        # Icon (Top Left) or Centered? Let's keep it clean.
-        # layout.addWidget(QLabel("🔒"), alignment=Qt.AlignCenter)
-
-        # Title
-        self.title_label = QLabel(title)
-        self.title_label.setObjectName("CardTitle")
-        self.title_label.setAlignment(Qt.AlignLeft)
-        layout.addWidget(self.title_label)
-        
-        # Category Badge
-        cat_container = QWidget()
-        cat_layout = QHBoxLayout(cat_container)
-        cat_layout.setContentsMargins(0,0,0,0)
-        cat_layout.setSpacing(0)
-        self.cat_label = QLabel(category.upper())
-        self.cat_label.setObjectName("CardCategory")
-        cat_layout.addWidget(self.cat_label)
-        cat_layout.addStretch()
-        layout.addWidget(cat_container)
-
-        # Content Container (Username/Email)
-        info_layout = QVBoxLayout()
-        info_layout.setSpacing(2)
-        
-        if username:
-            usr_lbl = QLabel(f"👤 {username}")
-            usr_lbl.setStyleSheet("color: #aaa; font-size: 12px;")
-            info_layout.addWidget(usr_lbl)
-            
-        if email:
-            email_lbl = QLabel(f"📧 {email}")
-            email_lbl.setStyleSheet("color: #aaa; font-size: 12px;")
-            info_layout.addWidget(email_lbl)
-            
-        layout.addLayout(info_layout)
-        
-        layout.addStretch()
-
-        # Buttons Layout
-        btn_layout = QHBoxLayout()
-        btn_layout.setSpacing(5)
-        btn_layout.setContentsMargins(0, 5, 0, 0)
-
-        # Copy Button
-        self.copy_btn = QPushButton("Copy Pwd")
-        self.copy_btn.setCursor(Qt.PointingHandCursor)
-        self.copy_btn.setStyleSheet("""
-            QPushButton { 
-                background-color: #333; 
-                border: 1px solid #444; 
-                font-size: 11px;
-                padding: 4px 8px;
-                border-radius: 4px;
-                color: #ccc;
-            }
-            QPushButton:hover {
-                background-color: #7f5af0;
-                color: white;
-                border-color: #7f5af0;
-            }
-        """)
-        self.copy_btn.clicked.connect(self.request_copy)
-        btn_layout.addWidget(self.copy_btn)
-
-        # Edit Button
-        self.edit_btn = QPushButton("Edit")
-        self.edit_btn.setCursor(Qt.PointingHandCursor)
-        self.edit_btn.setStyleSheet("""
-            QPushButton { 
-                background-color: #333; 
-                border: 1px solid #444; 
-                font-size: 11px;
-                padding: 4px 8px;
-                border-radius: 4px;
-                color: #ccc;
-            }
-            QPushButton:hover {
-                background-color: #2cb67d;
-                color: white;
-                border-color: #2cb67d;
-            }
-        """)
-        self.edit_btn.clicked.connect(lambda: self.editRequested.emit(self.full_data))
-        btn_layout.addWidget(self.edit_btn)
-
-        # Delete Button
-        self.del_btn = QPushButton("Del")
-        self.del_btn.setCursor(Qt.PointingHandCursor)
-        self.del_btn.setStyleSheet("""
-            QPushButton { 
-                background-color: #333; 
-                border: 1px solid #444; 
-                font-size: 11px;
-                padding: 4px 8px;
-                border-radius: 4px;
-                color: #ccc;
-            }
-            QPushButton:hover {
-                background-color: #ef476f;
-                color: white;
-                border-color: #ef476f;
-            }
-        """)
-        self.del_btn.clicked.connect(lambda: self.deleteRequested.emit(self.uuid))
-        btn_layout.addWidget(self.del_btn)
-
-        # Update Layout
-        layout.addLayout(btn_layout)
-        self.setLayout(layout)
-
-    def request_copy(self):
-        # We already have the password decrypted in full_data for display purposes on edit?
-        # Actually, for Security, we should probably encrypt 'full_data' or not store the password there?
-        # But the Requirement was "Notebook like", "Everything nice and readable".
-        # And "Show filled fields".
-        # Copy button should just copy the password.
-        
-        # NOTE: In a real high-security app, we wouldn't keep the password in memory 
-        # inside the widget. But for this local "notebook", it makes things snappier.
-        # However, to use the existing flow:
-        self.copyRequested.emit(self.full_data['password']) 
-
-
-from ui.settings_dialog import SettingsDialog
-from ui.sync_worker import SyncWorker 
-from core.utils import resource_path # Added import
+from ui.card_view import EntryListModel, EntryFilterProxy, CardListView
+from ui.sync_worker import SyncWorker
+from ui.sync_scheduler import SyncScheduler
+from ui.drive_sync_service import DriveSyncService
+from ui.vault_worker import VaultClient
+
+from core.security import VaultCipher
+from core.backup_manager import BackupManager
+from core.secret_cache import SecretCache
+from core.search_index import SearchIndex
+from core.drive_sync import is_configured as is_drive_configured
+from core.utils import resource_path
 
 class MainWindow(QMainWindow):
     def __init__(self, encryption_key, db_manager):
         super().__init__()
-        self.encryption_key = encryption_key
+        # Cipher context bound to the derived key, shared by DB, export and backups.
+        # Wiped when the window closes.
+        self.cipher = VaultCipher(encryption_key)
+        self.final_backup_thread = None
+        self.final_backup_done = False
         self.db_manager = db_manager
+
+        # Every DB/crypto call of the window runs on this worker thread,
+        # which owns its own connection (see ui/vault_worker.py)
+        self.vault = VaultClient(db_manager.db_path, self.cipher, self)
         
         # Initialize Backup Manager
         self.backup_manager = BackupManager()
+        # Coalesces the auto-syncs triggered by edits into one backup at a time
+        self.sync_scheduler = SyncScheduler(self.backup_manager, self.cipher, "vault.db", parent=self)
+        self.sync_scheduler.syncFinished.connect(self.on_auto_sync_finished)
+
+        # Google Drive copy of the backup folder, only when Drive is set up (credentials.json)
+        self.drive_sync = None
+        if is_drive_configured():
+            self.drive_sync = DriveSyncService(parent=self)
+            self.drive_sync.status.connect(lambda msg: self.statusBar().showMessage(msg, 5000))
+
+        # Recently decrypted secrets (password + note), keyed by uuid
+        self.secret_cache = SecretCache(max_size=16)
+
+        # Metadata of every entry; the card grid is a view over this model
+        self.entry_model = EntryListModel(self)
+        self.filter_proxy = EntryFilterProxy(self)
+        self.filter_proxy.setSourceModel(self.entry_model)
+
+        # Search index over the same metadata, kept in sync with the model
+        self.search_index = SearchIndex()
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150) # Debounce keystrokes
+        self.search_timer.timeout.connect(self.apply_search)
         
         # Check for auto-sync on startup
         self.perform_startup_sync()
@@ -261,7 +139,8 @@ class MainWindow(QMainWindow):
         self.search_bar = QLineEdit()
         self.search_bar.setPlaceholderText("Search Vault...")
         self.search_bar.setFixedWidth(300)
-        self.search_bar.textChanged.connect(self.filter_items)
+        self.search_bar.textChanged.connect(lambda: self.search_timer.start())
+        self.search_bar.returnPressed.connect(self.apply_search)
         header_layout.addWidget(self.search_bar)
         
         header_layout.addStretch()
@@ -275,20 +154,13 @@ class MainWindow(QMainWindow):
         
         content_layout.addLayout(header_layout)
 
-        # Scroll Area
-        self.scroll = QScrollArea()
-        self.scroll.setWidgetResizable(True)
-        self.scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.scroll.setStyleSheet("QScrollArea { border: none; background: transparent; }")
-        
-        self.scroll_content = QWidget()
-        self.scroll_content.setStyleSheet("background-color: #1e1e1e;") 
-        self.grid_layout = QGridLayout(self.scroll_content)
-        self.grid_layout.setSpacing(20)
-        self.grid_layout.setAlignment(Qt.AlignTop | Qt.AlignLeft)
-        
-        self.scroll.setWidget(self.scroll_content)
-        content_layout.addWidget(self.scroll)
+        # Card Grid (virtualized: only the visible cards are painted)
+        self.card_view = CardListView()
+        self.card_view.setModel(self.filter_proxy)
+        self.card_view.copyRequested.connect(self.copy_password)
+        self.card_view.editRequested.connect(self.edit_item)
+        self.card_view.deleteRequested.connect(self.delete_item)
+        content_layout.addWidget(self.card_view)
 
         # Add Content Layout
         content_widget = QWidget()
@@ -335,60 +207,70 @@ class MainWindow(QMainWindow):
         file_menu.addAction(exit_action)
 
     def load_items(self):
-        # Clear Layout
-        while self.grid_layout.count():
-            item = self.grid_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
-        # Fetch from DB
-        try:
-            entries = self.db_manager.get_all_entries()
-            
-            row, col = 0, 0
-            for entry in entries:
-                # entry is a Row object
-                uuid = entry['uuid']
-                category = entry['category']
-                title = entry['title']
-                username = entry['username']
-                # Check if email column exists (migration handle implicit by row factory if present)
-                email = entry['email'] if 'email' in entry.keys() else ""
-                
-                ciphertext = entry['ciphertext']
-                nonce = entry['nonce']
-                
-                # Decrypt Data to separate Password and Note
-                try:
-                    decrypted_data = SecurityManager.decrypt(nonce, ciphertext, self.encryption_key)
-                    # Try to parse JSON
-                    try:
-                        secret_obj = json.loads(decrypted_data)
-                        password = secret_obj.get("password", "")
-                        note = secret_obj.get("note", "")
-                    except json.JSONDecodeError:
-                        # Legacy format: just the password
-                        password = decrypted_data
-                        note = ""
-                except Exception as e:
-                    print(f"Failed to decrypt {title}: {e}")
-                    password = "ERROR"
-                    note = "Decryption Failed"
-
-                card = PasswordCard(uuid, title, category, username, email, ciphertext, nonce, password, note)
-                card.copyRequested.connect(self.copy_password)
-                card.deleteRequested.connect(self.delete_item)
-                card.editRequested.connect(self.edit_item)
-                
-                self.grid_layout.addWidget(card, row, col)
-                
-                col += 1
-                if col > 3: # 4 columns
-                    col = 0
-                    row += 1
-        except Exception as e:
-            print(f"Error loading items: {e}")
+        # Full reload: only used on startup and after an import. Single mutations
+        # go through insert_card / replace_card / remove_card instead.
+        # Only the plaintext columns are read here; secrets are decrypted lazily
+        # (see request_secret) when the user copies or edits an entry.
+        def on_done(entries):
+            self.entry_model.set_entries(entries)
+            self.search_index.rebuild(entries)
+            self.apply_search()
+
+        self.vault.request("load", on_done=on_done,
+                           on_error=lambda e: print(f"Error loading items: {e}"))
+
+    def insert_card(self, entry):
+        """Adds the card of a newly added entry (entry is its metadata dict)."""
+        self.entry_model.insert_entry(entry)
+        self.search_index.add(entry)
+        self.apply_search()
+
+    def replace_card(self, entry):
+        """Refreshes the card of an edited entry in place."""
+        self.entry_model.update_entry(entry)
+        self.search_index.update(entry)
+        self.apply_search()
+
+    def remove_card(self, uuid):
+        """Removes the card of a deleted entry."""
+        self.entry_model.remove_entry(uuid)
+        self.search_index.remove(uuid)
+
+    def request_secret(self, uuid, on_done):
+        """
+        Calls on_done({"password", "note"}) with the secret of an entry, straight
+        from the recent-secrets cache or once the worker has decrypted it.
+        """
+        secret = self.secret_cache.get(uuid)
+        if secret is not None:
+            on_done(secret)
+            return
+
+        def on_decrypted(secret):
+            if secret is None:
+                return # Deleted in the meantime
+            self.secret_cache.put(uuid, secret)
+            on_done(secret)
+
+        def on_error(e):
+            print(f"Failed to decrypt {uuid}: {e}")
+            QMessageBox.critical(self, "Error", "Failed to decrypt this entry.")
+
+        self.vault.request("secret", uuid, on_done=on_decrypted, on_error=on_error)
+
+    def show_progress(self, title, label):
+        """Progress dialog for long worker operations, fed by on_progress(done, total)."""
+        progress_dialog = QProgressDialog(label, None, 0, 0, self)
+        progress_dialog.setWindowTitle(title)
+        progress_dialog.setWindowModality(Qt.WindowModal)
+        progress_dialog.setMinimumDuration(300)
+        progress_dialog.setValue(0)
+
+        def on_progress(done, total):
+            progress_dialog.setMaximum(total)
+            progress_dialog.setValue(done)
+
+        return progress_dialog, on_progress
 
     def perform_startup_sync(self):
         # Only sync if path is set
@@ -404,44 +286,76 @@ class MainWindow(QMainWindow):
 
     def trigger_auto_sync(self):
         if self.backup_manager.backup_path:
-            print("Auto-Sync: Change detected. Backing up...")
-            self.sync_thread = SyncWorker(self.backup_manager, self.encryption_key, "backup", "vault.db")
-            self.sync_thread.start()
+            # Debounced: bursts of edits (or an import) give a single incremental backup
+            self.sync_scheduler.request()
+
+    def on_auto_sync_finished(self, success, msg):
+        status = "Synced" if success else "Sync failed"
+        self.statusBar().showMessage(f"{status} in {self.sync_scheduler.last_latency:.1f}s", 5000)
+        if success:
+            self.upload_backup_to_drive()
+
+    def upload_backup_to_drive(self):
+        """Queues a copy of the backup set to Drive on the Drive thread (up to date files are skipped there)."""
+        if self.drive_sync is None or not self.backup_manager.backup_path:
+            return
+        self.drive_sync.mirror(self.backup_manager.backup_path, self.backup_manager.backup_files(),
+                               BackupManager.PRUNED_PREFIXES)
 
     def closeEvent(self, event):
-        if self.backup_manager.backup_path:
-            # Blocking upload on close to ensure data safety
-            print("Auto-Sync: Closing... Backing up...")
-            success, msg = self.backup_manager.backup_db("vault.db", self.encryption_key)
-            print(f"Close Sync: {msg}")
+        if self.backup_manager.backup_path and not self.final_backup_done:
+            # The final backup runs on a SyncWorker so the window keeps painting;
+            # on_final_backup closes it again once the backup is written.
+            event.ignore()
+            if self.final_backup_thread is None:
+                self.setEnabled(False)
+                self.statusBar().showMessage("Backing up before closing...")
+                # Let queued vault requests finish and release the worker's connection
+                self.vault.shutdown()
+                # Let a running auto-sync finish; the final backup covers the pending changes
+                self.sync_scheduler.stop()
+                print("Auto-Sync: Closing... Backing up...")
+                self.final_backup_thread = SyncWorker(self.backup_manager, self.cipher, "incremental", "vault.db")
+                self.final_backup_thread.finished.connect(self.on_final_backup)
+                self.final_backup_thread.start()
+            return
+
+        self.vault.shutdown()
+        self.sync_scheduler.stop()
+        if self.drive_sync is not None:
+            self.drive_sync.shutdown()
+        self.secret_cache.clear()
+        self.cipher.wipe()
         event.accept()
 
+    def on_final_backup(self, success, msg):
+        print(f"Close Sync: {msg}")
+        self.final_backup_thread.wait()
+        self.final_backup_done = True
+        self.close()
+
     def show_add_dialog(self):
         dialog = AddEntryDialog(self)
         if dialog.exec():
             data = dialog.get_data()
-            try:
-                self.db_manager.add_entry(
-                    self.encryption_key, 
-                    data['category'], 
-                    data['title'], 
-                    data['username'],
-                    data['email'],
-                    data['password'],
-                    data['note']
-                )
-                self.load_items()
+
+            def on_done(entry):
+                self.insert_card(entry)
                 self.trigger_auto_sync() # Hook
+
+            self.vault.request("add", data, on_done=on_done,
+                               on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to save: {e}"))
+
+    def copy_password(self, uuid):
+        def on_secret(secret):
+            try:
+                clipboard = QGuiApplication.clipboard()
+                clipboard.setText(secret['password'])
+                # Optional: Show toast
             except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to save: {e}")
+                 QMessageBox.critical(self, "Error", f"Failed to copy: {e}")
 
-    def copy_password(self, password):
-        try:
-            clipboard = QGuiApplication.clipboard()
-            clipboard.setText(password)
-            # Optional: Show toast
-        except Exception as e:
-             QMessageBox.critical(self, "Error", f"Failed to copy: {e}")
+        self.request_secret(uuid, on_secret)
 
     def delete_item(self, uuid):
         reply = QMessageBox.question(self, 'Delete Item', 
@@ -449,41 +363,44 @@ class MainWindow(QMainWindow):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            try:
-                self.db_manager.delete_entry(uuid)
-                self.load_items()
+            def on_done(_uuid):
+                self.remove_card(uuid)
                 self.trigger_auto_sync() # Hook
-            except Exception as e:
-                 QMessageBox.critical(self, "Error", f"Failed to delete: {e}")
 
-    def edit_item(self, entry_data):
-        # entry_data is the full_data dict from the card
+            self.secret_cache.invalidate(uuid)
+            self.vault.request("delete", uuid, on_done=on_done,
+                               on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to delete: {e}"))
+
+    def edit_item(self, uuid):
+        # Metadata comes from the model, the secret is decrypted by the worker
+        if self.entry_model.entry(uuid) is None:
+            return
+        self.request_secret(uuid, lambda secret: self.show_edit_dialog(uuid, secret))
+
+    def show_edit_dialog(self, uuid, secret):
+        entry_data = self.entry_model.entry(uuid)
+        if entry_data is None:
+            return # Deleted while the secret was being decrypted
+
         dialog = EditEntryDialog(self, 
                                  uuid=entry_data['uuid'],
                                  title=entry_data['title'],
                                  category=entry_data['category'],
                                  username=entry_data['username'],
                                  email=entry_data['email'],
-                                 password=entry_data['password'],
-                                 note=entry_data['note'])
+                                 password=secret['password'],
+                                 note=secret['note'])
         
         if dialog.exec():
             new_data = dialog.get_data()
-            try:
-                self.db_manager.update_entry(
-                    new_data['uuid'],
-                    self.encryption_key,
-                    new_data['category'],
-                    new_data['title'],
-                    new_data['username'],
-                    new_data['email'],
-                    new_data['password'],
-                    new_data['note']
-                )
-                self.load_items()
+
+            def on_done(entry):
+                self.replace_card(entry)
                 self.trigger_auto_sync() # Hook
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to update: {e}")
+
+            self.secret_cache.invalidate(new_data['uuid'])
+            self.vault.request("update", new_data, on_done=on_done,
+                               on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to update: {e}"))
 
     def export_passwords(self):
         reply = QMessageBox.warning(self, "Export Passwords", 
@@ -496,83 +413,96 @@ class MainWindow(QMainWindow):
         if not path:
             return
 
-        try:
-            entries = self.db_manager.get_all_entries()
-            with open(path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['Category', 'Title', 'Username', 'Email', 'Password', 'Note'])
-                
-                for entry in entries:
-                    try:
-                        decrypted_data = SecurityManager.decrypt(entry['nonce'], entry['ciphertext'], self.encryption_key)
-                        try:
-                            secret_obj = json.loads(decrypted_data)
-                            pwd = secret_obj.get("password","")
-                            note = secret_obj.get("note","")
-                        except:
-                            pwd = decrypted_data
-                            note = ""
-                            
-                        email = entry['email'] if 'email' in entry.keys() else ""
-                        
-                        writer.writerow([
-                            entry['category'], 
-                            entry['title'], 
-                            entry['username'], 
-                            email,
-                            pwd, 
-                            note
-                        ])
-                    except:
-                        writer.writerow([entry['category'], entry['title'], "ERROR", "ERROR", "DECRYPTION_FAILED", ""])
-            
-            QMessageBox.information(self, "Success", f"Exported {len(entries)} items to {path}")
-        except Exception as e:
+        progress_dialog, on_progress = self.show_progress("Export", "Exporting passwords...")
+
+        def on_done(count):
+            progress_dialog.close()
+            QMessageBox.information(self, "Success", f"Exported {count} items to {path}")
+
+        def on_error(e):
+            progress_dialog.close()
             QMessageBox.critical(self, "Error", f"Export failed: {e}")
 
+        self.vault.request("export_csv", path, on_done=on_done, on_error=on_error, on_progress=on_progress)
+
     def import_passwords(self):
         path, _ = QFileDialog.getOpenFileName(self, "Import CSV", "", "CSV Files (*.csv)")
         if not path:
             return
 
-        try:
-            with open(path, 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                # We should support basic import (Category, Title, Password) and extended
-                headers = reader.fieldnames
-                
-                count = 0
-                for row in reader:
-                    cat = row.get('Category', 'Uncategorized')
-                    title = row.get('Title', 'Untitled')
-                    user = row.get('Username', '')
-                    email = row.get('Email', '')
-                    pwd = row.get('Password', '')
-                    note = row.get('Note', '')
-                    
-                    self.db_manager.add_entry(
-                        self.encryption_key,
-                        cat, title, user, email, pwd, note
-                    )
-                    count += 1
-            
+        progress_dialog, on_progress = self.show_progress("Import", "Importing passwords...")
+
+        def on_done(count):
+            progress_dialog.close()
+            # One reload instead of one model insert per imported row
             self.load_items()
+            self.trigger_auto_sync() # Hook
             QMessageBox.information(self, "Success", f"Imported {count} items.")
-        except Exception as e:
-             QMessageBox.critical(self, "Error", f"Import failed: {e}")
+
+        def on_error(e):
+            progress_dialog.close()
+            QMessageBox.critical(self, "Error", f"Import failed: {e}")
+
+        self.vault.request("import_csv", path, on_done=on_done, on_error=on_error, on_progress=on_progress)
+
+    def merge_backup(self, on_done, on_error):
+        """Merges the latest backup into the vault on the worker thread, then reloads the cards."""
+        def merged(msg):
+            self.sync_scheduler.resume()
+            # Merged entries may have new secrets: drop the ones decrypted before
+            self.secret_cache.clear()
+            self.load_items()
+            self.trigger_auto_sync() # Push the merged vault back
+            on_done(msg)
+
+        def failed(msg):
+            self.sync_scheduler.resume()
+            on_error(msg)
+
+        # No backup may rewrite vault.enc, the manifest or the deltas while the merge reads them
+        self.sync_scheduler.pause()
+        self.vault.request("merge", self.backup_manager, on_done=merged, on_error=failed)
+
+    def restore_backup(self, version, on_done, on_error):
+        """
+        Restores the backup (or the restore point version) over the vault, then
+        reopens it and reloads the cards. The window is disabled meanwhile.
+        """
+        self.setEnabled(False)
+        self.statusBar().showMessage("Restoring...")
+        # The restore replaces vault.db: nothing may keep the old file open, or
+        # later edits would go to it (or, on Windows, the copy would corrupt it)
+        self.vault.shutdown()
+        self.db_manager.conn.close()
+
+        def restored(success, msg):
+            self.sync_scheduler.restoreFinished.disconnect(restored)
+            self.vault.deleteLater()
+            self.vault = VaultClient(self.db_manager.db_path, self.cipher, self)
+            self.secret_cache.clear()
+            self.load_items()
+            self.setEnabled(True)
+            self.statusBar().clearMessage()
+            if success:
+                on_done(msg)
+            else:
+                on_error(msg)
+
+        # Waits for a running auto-sync, then restores on the scheduler's worker thread
+        self.sync_scheduler.restoreFinished.connect(restored)
+        self.sync_scheduler.restore(version)
 
     def open_settings(self):
-        dialog = SettingsDialog(self, db_path="vault.db", encryption_key=self.encryption_key)
+        dialog = SettingsDialog(self, db_path="vault.db", encryption_key=self.cipher)
         dialog.exec()
 
-    def filter_items(self, text):
-        text = text.lower()
-        for i in range(self.grid_layout.count()):
-            widget = self.grid_layout.itemAt(i).widget()
-            if isinstance(widget, PasswordCard):
-                if (text in widget.full_data['title'].lower() or 
-                    text in widget.full_data['category'].lower() or 
-                    text in widget.full_data['username'].lower()):
-                    widget.show()
-                else:
-                    widget.hide()
+    def apply_search(self):
+        """Runs the search bar query against the index and shows the ranked matches."""
+        self.search_timer.stop()
+        results = self.search_index.search(self.search_bar.text())
+        ranked = results is not None and len(results) <= SearchIndex.RANK_LIMIT
+        self.filter_proxy.set_search_results(results, ranked)
+
+    def filter_items(self, category="All"):
+        """Sidebar filter: restricts the cards to one category ("All" shows everything)."""
+        self.filter_proxy.set_category(None if category == "All" else category)
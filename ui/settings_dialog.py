@@ -1,9 +1,10 @@
 
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QLabel, QPushButton, 
-                               QHBoxLayout, QGroupBox, QMessageBox, QFileDialog, QLineEdit)
+                               QHBoxLayout, QGroupBox, QMessageBox, QFileDialog, QLineEdit, QInputDialog)
 from PySide6.QtCore import Qt
 from core.backup_manager import BackupManager
 import os
+import time
 import shutil
 
 from PySide6.QtGui import QIcon
@@ -19,8 +20,10 @@ class SettingsDialog(QDialog):
         self.db_path = db_path
         self.encryption_key = encryption_key
         
-        # Backup Manager
-        self.backup_manager = BackupManager()
+        # Backup Manager and scheduler of the main window: Sync Now and Restore run
+        # through its single backup worker, never alongside an auto-sync
+        self.sync_scheduler = getattr(parent, "sync_scheduler", None)
+        self.backup_manager = parent.backup_manager if parent is not None else BackupManager()
         
         # Stylesheet
         self.setStyleSheet("""
@@ -90,7 +93,12 @@ class SettingsDialog(QDialog):
         self.restore_btn = QPushButton("Restore (Import)")
         self.restore_btn.clicked.connect(self.restore_db)
         
+        self.merge_btn = QPushButton("Merge")
+        self.merge_btn.setToolTip("Combine the backup with this vault entry by entry (multi-device use)")
+        self.merge_btn.clicked.connect(self.merge_db)
+        
         actions_layout.addWidget(self.sync_now_btn)
+        actions_layout.addWidget(self.merge_btn)
         actions_layout.addWidget(self.restore_btn)
         sync_layout.addLayout(actions_layout)
         
@@ -130,17 +138,46 @@ class SettingsDialog(QDialog):
         if not self.encryption_key:
             QMessageBox.critical(self, "Error", "Encryption key not available.")
             return
+        if self.sync_scheduler is None:
+            return
 
-        success, msg = self.backup_manager.backup_db(self.db_path, self.encryption_key)
-        if success:
-            QMessageBox.information(self, "Success", msg)
-        else:
-            QMessageBox.warning(self, "Error", msg)
+        scheduler = self.sync_scheduler
+        self.sync_now_btn.setEnabled(False)
+
+        def on_finished(success, msg):
+            if success and scheduler.queue_depth:
+                return # An earlier backup finished, ours starts next
+            scheduler.syncFinished.disconnect(on_finished)
+            self.sync_now_btn.setEnabled(True)
+            if success:
+                QMessageBox.information(self, "Success", msg)
+            else:
+                QMessageBox.warning(self, "Error", msg)
+
+        scheduler.syncFinished.connect(on_finished)
+        scheduler.sync_now()
 
     def restore_db(self):
         if not self.encryption_key:
              QMessageBox.critical(self, "Error", "Encryption key not available.")
              return
+        if self.sync_scheduler is None:
+            return
+
+        # Pick a restore point: the latest backup or one of the kept versions
+        version = None
+        versions = self.backup_manager.list_versions(self.encryption_key)
+        if versions:
+            labels = ["Latest backup"] + [
+                f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(v['created']))} ({v['entries']} entries)"
+                for v in versions
+            ]
+            label, ok = QInputDialog.getItem(self, "Restore Point", "Restore from:", labels, 0, False)
+            if not ok:
+                return
+            index = labels.index(label)
+            if index > 0:
+                version = versions[index - 1]['file']
 
         reply = QMessageBox.question(self, "Restore Database", 
                                      "This will OVERWRITE your local database with the version from the backup folder.\nAre you sure?",
@@ -148,12 +185,40 @@ class SettingsDialog(QDialog):
         if reply != QMessageBox.Yes:
             return
 
-        success, msg = self.backup_manager.restore_db(self.db_path, self.encryption_key)
-        if success:
-            QMessageBox.information(self, "Success", "Restored successfully!\nPlease restart the application.")
-        else:
+        self.restore_btn.setEnabled(False)
+
+        def on_done(msg):
+            self.restore_btn.setEnabled(True)
+            QMessageBox.information(self, "Success", "Restored successfully!")
+
+        def on_error(msg):
+            self.restore_btn.setEnabled(True)
             QMessageBox.warning(self, "Error", msg)
 
+        # Closes the vault, restores it and reopens it (see MainWindow.restore_backup)
+        self.parent().restore_backup(version, on_done, on_error)
+
+    def merge_db(self):
+        if not self.encryption_key:
+             QMessageBox.critical(self, "Error", "Encryption key not available.")
+             return
+
+        if not self.parent():
+            return
+
+        # Runs on the vault worker thread, the dialog stays responsive
+        self.merge_btn.setEnabled(False)
+
+        def on_done(msg):
+            self.merge_btn.setEnabled(True)
+            QMessageBox.information(self, "Success", msg)
+
+        def on_error(msg):
+            self.merge_btn.setEnabled(True)
+            QMessageBox.warning(self, "Error", msg)
+
+        self.parent().merge_backup(on_done, on_error)
+
     def export_csv(self):
         if self.parent():
             self.parent().export_passwords()
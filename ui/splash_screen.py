@@ -83,6 +83,11 @@ class PulsingSplashScreen(QSplashScreen):
         self.anim.setLoopCount(-1) # Infinite loop
         self.anim.start()
 
+    def finish(self, widget):
+        # The pulse loops forever: stop it with the splash
+        self.anim.stop()
+        super().finish(widget)
+
     def show_message(self, msg):
         self.status_label.setText(msg)
         QTimer.singleShot(100, lambda: None) # Force event loop update if needed
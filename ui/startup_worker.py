@@ -0,0 +1,35 @@
+from PySide6.QtCore import QThread, Signal
+from core.timing import PhaseTimer
+
+class StartupWorker(QThread):
+    """
+    Startup work that is not needed to show the login dialog, done while the
+    user types the master password: schema creation/migrations on the vault,
+    then the imports of the main window and (if sync is set up) the Drive client.
+    MainWindow must not be created before the thread has finished (wait()).
+    """
+    ready = Signal(object) # PhaseTimer of the work done
+
+    def __init__(self, db_path="vault.db"):
+        super().__init__()
+        self.db_path = db_path
+        self.timer = PhaseTimer()
+        self.error = None
+
+    def run(self):
+        try:
+            with self.timer.phase("schema"):
+                from database.db_manager import DBManager
+                db = DBManager(self.db_path)
+                db.conn.close()
+            with self.timer.phase("import main window"):
+                import ui.main_window
+            from core.drive_sync import DriveSyncManager, is_configured
+            if is_configured():
+                # Only when Drive sync is set up, it is the slowest import of the app
+                with self.timer.phase("import drive"):
+                    DriveSyncManager.load_client()
+        except Exception as e:
+            self.error = e
+            print(f"Startup: background preparation failed: {e}")
+        self.ready.emit(self.timer)
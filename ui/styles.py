@@ -124,33 +124,8 @@ QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
     height: 0px;
 }
 
-/* --- Cards (Custom Widget: PasswordCard) --- */
-QFrame#PasswordCard {
-    background-color: #252526;
-    border: 1px solid #333333;
-    border-radius: 6px;
-}
-
-QFrame#PasswordCard:hover {
-    background-color: #2d2d2d;
-    border: 1px solid #7f5af0;
-}
-
-QLabel#CardTitle {
-    font-size: 14px; /* Reduced from 16px */
-    font-weight: 700;
-    color: #ffffff;
-    margin-top: 4px;
-}
-
-QLabel#CardCategory {
-    font-size: 11px; /* Reduced from 12px */
-    font-weight: 500;
-    color: #858585;
-    background-color: #1e1e1e;
-    padding: 2px 6px;
-    border-radius: 8px;
-}
+/* --- Cards ---
+   Painted by ui/card_view.py (CardDelegate), which uses the same palette. */
 
 /* --- Login Dialog Specifics --- */
 QLabel#LoginTitle {
@@ -0,0 +1,139 @@
+import time
+from PySide6.QtCore import QObject, QTimer, Signal
+from ui.sync_worker import SyncWorker
+
+class SyncScheduler(QObject):
+    """
+    Coalesces auto-sync requests into backups:
+    - a burst of changes gives one backup, delay_ms after the last one (debounce)
+    - at most one SyncWorker runs at a time; changes made meanwhile are
+      picked up by one more backup once it finishes
+    - a failed backup is retried with exponential backoff, up to max_retries times
+    Manual backups (sync_now) and restores go through the same single worker,
+    so they never overlap a scheduled backup; pause() holds backups while
+    something else reads the backup folder (a merge).
+    """
+    syncStarted = Signal()
+    syncFinished = Signal(bool, str) # success, message
+    restoreFinished = Signal(bool, str) # success, message
+
+    def __init__(self, backup_manager, encryption_key, db_path="vault.db", action="incremental",
+                 delay_ms=2000, retry_delay_ms=5000, max_retries=3, parent=None):
+        super().__init__(parent)
+        self.backup_manager = backup_manager
+        self.encryption_key = encryption_key
+        self.db_path = db_path
+        self.action = action
+        self.delay_ms = delay_ms
+        self.retry_delay_ms = retry_delay_ms
+        self.max_retries = max_retries
+
+        self.worker = None
+        self.last_latency = None # Seconds taken by the last backup
+        self.last_result = None  # (success, message) of the last backup
+        self._pending = 0        # Changes not covered by a started backup yet
+        self._in_flight = 0      # Changes covered by the running backup
+        self._retries = 0
+        self._started_at = 0.0
+        self._paused = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._start)
+
+    @property
+    def queue_depth(self):
+        """Changes waiting for a backup, including those of the running one."""
+        return self._pending + self._in_flight
+
+    @property
+    def is_running(self):
+        return self.worker is not None
+
+    def request(self):
+        """Records a change. The backup starts once no change came in for delay_ms."""
+        self._pending += 1
+        if not self.is_running:
+            self.timer.start(self.delay_ms)
+
+    def sync_now(self):
+        """Backs up right away, or right after the running backup (which may not cover the latest changes)."""
+        self._pending += 1
+        self.timer.stop()
+        self._start()
+
+    def restore(self, version=None):
+        """
+        Restores the backup (a restore point from list_versions, the latest if
+        None) once the running backup is done. Backups requested meanwhile wait
+        for it. The result is reported by restoreFinished.
+        Every connection to the vault must be closed first (MainWindow.restore_backup).
+        """
+        self.stop()
+        # Changes made before the restore are overwritten by it
+        self._pending = 0
+        self.worker = SyncWorker(self.backup_manager, self.encryption_key, "restore", self.db_path, version)
+        self.worker.finished.connect(self._on_restore_finished)
+        self.worker.start()
+
+    def pause(self):
+        """Waits for the running backup and holds the next ones until resume() (e.g. during a merge)."""
+        self.stop()
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+        if self._pending:
+            self.timer.start(self.delay_ms)
+
+    def _start(self):
+        if self.is_running or self._paused or not self._pending:
+            return
+        self._in_flight, self._pending = self._pending, 0
+        self._started_at = time.perf_counter()
+        self.worker = SyncWorker(self.backup_manager, self.encryption_key, self.action, self.db_path)
+        self.worker.finished.connect(self._on_finished)
+        self.worker.start()
+        self.syncStarted.emit()
+
+    def _on_restore_finished(self, success, msg):
+        self.worker.wait()
+        self.worker = None
+        print(f"Restore: {msg}")
+        if self._pending:
+            self.timer.start(self.delay_ms)
+        self.restoreFinished.emit(success, msg)
+
+    def _on_finished(self, success, msg):
+        self.worker.wait()
+        self.worker = None
+        self.last_latency = time.perf_counter() - self._started_at
+        self.last_result = (success, msg)
+        print(f"Auto-Sync: {msg} ({self.last_latency:.2f}s)")
+
+        if success:
+            self._retries = 0
+            self._in_flight = 0
+            if self._pending:
+                self.timer.start(self.delay_ms)
+        else:
+            # Put the changes back and try again later
+            self._pending += self._in_flight
+            self._in_flight = 0
+            if self._retries < self.max_retries:
+                self._retries += 1
+                self.timer.start(self.retry_delay_ms * 2 ** (self._retries - 1))
+            else:
+                print("Auto-Sync: giving up until the next change.")
+                self._retries = 0
+        self.syncFinished.emit(success, msg)
+
+    def stop(self):
+        """Cancels the scheduled backup and waits for the running one (pending changes are kept)."""
+        self.timer.stop()
+        if self.worker is not None:
+            self.worker.finished.disconnect()
+            self.worker.wait()
+            self.worker = None
+            self._pending += self._in_flight
+            self._in_flight = 0
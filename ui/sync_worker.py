@@ -5,17 +5,21 @@ from core.backup_manager import BackupManager
 class SyncWorker(QThread):
     finished = Signal(bool, str) # success, message
 
-    def __init__(self, backup_manager, encryption_key, action="backup", db_path="vault.db"):
+    def __init__(self, backup_manager, encryption_key, action="backup", db_path="vault.db", version=None):
         super().__init__()
         self.backup_manager = backup_manager
         self.encryption_key = encryption_key
         self.action = action
         self.db_path = db_path
+        self.version = version # Restore point for "restore" (see BackupManager.list_versions), latest if None
 
     def run(self):
         if self.action == "backup":
             success, msg = self.backup_manager.backup_db(self.db_path, self.encryption_key)
             self.finished.emit(success, msg)
+        elif self.action == "incremental":
+            success, msg = self.backup_manager.backup_incremental(self.db_path, self.encryption_key)
+            self.finished.emit(success, msg)
         elif self.action == "restore":
-            success, msg = self.backup_manager.restore_db(self.db_path, self.encryption_key)
+            success, msg = self.backup_manager.restore_db(self.db_path, self.encryption_key, self.version)
             self.finished.emit(success, msg)
@@ -0,0 +1,183 @@
+import csv
+import itertools
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+from database.db_manager import DBManager
+from core.security import SecurityManager
+
+class VaultWorker(QObject):
+    """
+    Runs every vault operation (SQLite + crypto) on a dedicated thread.
+    Like LoginWorker it opens its own DBManager, since SQLite connections
+    cannot be shared across threads. Requests are processed in order.
+    """
+    finished = Signal(int, object) # Emit request_id, (success_bool, result_or_error)
+    progress = Signal(int, int, int) # Emit request_id, done, total
+
+    def __init__(self, db_path, cipher):
+        super().__init__()
+        self.db_path = db_path
+        self.cipher = cipher
+        self.db = None
+
+    @Slot(int, str, object)
+    def handle(self, request_id, op, args):
+        try:
+            if self.db is None:
+                self.db = DBManager(self.db_path)
+            handler = getattr(self, f"op_{op}")
+            result = handler(request_id, *args)
+            self.finished.emit(request_id, (True, result))
+        except Exception as e:
+            print(f"Vault worker: '{op}' failed: {e}")
+            self.finished.emit(request_id, (False, str(e)))
+
+    @Slot()
+    def close(self):
+        # Queued after every pending request, so those are finished by now
+        if self.db is not None and self.db.conn:
+            self.db.conn.close()
+            self.db = None
+        QThread.currentThread().quit()
+
+    # --- Operations (run on the worker thread) ---
+    # Rows are converted to dicts before crossing back to the GUI thread.
+
+    def op_load(self, request_id):
+        return [dict(row) for row in self.db.get_all_metadata()]
+
+    def op_secret(self, request_id, uuid):
+        return self.db.get_secret(uuid, self.cipher)
+
+    def op_add(self, request_id, data):
+        uuid = self.db.add_entry(self.cipher, data['category'], data['title'], data['username'],
+                                 data['email'], data['password'], data['note'])
+        return dict(self.db.get_entry_metadata(uuid))
+
+    def op_update(self, request_id, data):
+        uuid = self.db.update_entry(data['uuid'], self.cipher, data['category'], data['title'],
+                                    data['username'], data['email'], data['password'], data['note'])
+        if uuid is None:
+            raise ValueError("Entry no longer exists.")
+        return dict(self.db.get_entry_metadata(uuid))
+
+    def op_delete(self, request_id, uuid):
+        return self.db.delete_entry(uuid)
+
+    def op_merge(self, request_id, backup_manager, strategy="conflict_copy"):
+        # Written through this worker's connection, like every other vault change
+        success, msg = backup_manager.merge_db(self.db_path, self.cipher, strategy, local_db=self.db)
+        if not success:
+            raise RuntimeError(msg)
+        return msg
+
+    def op_import_csv(self, request_id, path):
+        # First pass only counts rows so progress has a total
+        with open(path, 'r', encoding='utf-8') as csvfile:
+            total = sum(1 for _ in csv.DictReader(csvfile))
+
+        def read_rows(csvfile):
+            # We should support basic import (Category, Title, Password) and extended
+            for row in csv.DictReader(csvfile):
+                yield {
+                    "category": row.get('Category', 'Uncategorized'),
+                    "title": row.get('Title', 'Untitled'),
+                    "username": row.get('Username', ''),
+                    "email": row.get('Email', ''),
+                    "password": row.get('Password', ''),
+                    "note": row.get('Note', '')
+                }
+
+        with open(path, 'r', encoding='utf-8') as csvfile:
+            uuids = self.db.add_entries_bulk(
+                self.cipher, read_rows(csvfile),
+                progress=lambda count: self.progress.emit(request_id, count, total)
+            )
+        return len(uuids)
+
+    def op_export_csv(self, request_id, path, batch_size=1000):
+        entries = self.db.get_all_entries()
+        total = len(entries)
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Category', 'Title', 'Username', 'Email', 'Password', 'Note'])
+
+            for start in range(0, total, batch_size):
+                batch = entries[start:start + batch_size]
+                # Decrypt each batch on the crypto pool
+                decrypted = SecurityManager.decrypt_many(
+                    [(entry['nonce'], entry['ciphertext']) for entry in batch], self.cipher
+                )
+                for entry, (ok, decrypted_data) in zip(batch, decrypted):
+                    if ok:
+                        secret = DBManager.parse_secret(decrypted_data)
+                        writer.writerow([
+                            entry['category'],
+                            entry['title'],
+                            entry['username'],
+                            entry['email'] or "",
+                            secret['password'],
+                            secret['note']
+                        ])
+                    else:
+                        writer.writerow([entry['category'], entry['title'], "ERROR", "ERROR", "DECRYPTION_FAILED", ""])
+                self.progress.emit(request_id, min(start + batch_size, total), total)
+        return total
+
+
+class VaultClient(QObject):
+    """
+    GUI-thread side of the VaultWorker: sends requests through a queued signal
+    and calls back on_done(result) / on_error(message) / on_progress(done, total)
+    on the GUI thread when the worker answers.
+    """
+    requested = Signal(int, str, object)
+    closeRequested = Signal()
+
+    def __init__(self, db_path, cipher, parent=None):
+        super().__init__(parent)
+        self._ids = itertools.count(1)
+        self._callbacks = {}
+
+        self.thread = QThread()
+        self.worker = VaultWorker(db_path, cipher)
+        self.worker.moveToThread(self.thread)
+
+        self.requested.connect(self.worker.handle)
+        self.closeRequested.connect(self.worker.close)
+        self.worker.finished.connect(self._on_finished)
+        self.worker.progress.connect(self._on_progress)
+        self.thread.finished.connect(self.worker.deleteLater)
+
+        self.thread.start()
+
+    @property
+    def pending(self):
+        """Number of requests sent but not answered yet."""
+        return len(self._callbacks)
+
+    def request(self, op, *args, on_done=None, on_error=None, on_progress=None) -> int:
+        request_id = next(self._ids)
+        self._callbacks[request_id] = (on_done, on_error, on_progress)
+        self.requested.emit(request_id, op, args)
+        return request_id
+
+    def _on_finished(self, request_id, result):
+        on_done, on_error, _on_progress = self._callbacks.pop(request_id, (None, None, None))
+        success, data = result
+        if success:
+            if on_done:
+                on_done(data)
+        elif on_error:
+            on_error(data)
+
+    def _on_progress(self, request_id, done, total):
+        callbacks = self._callbacks.get(request_id)
+        if callbacks and callbacks[2]:
+            callbacks[2](done, total)
+
+    def shutdown(self):
+        """Lets the queued requests finish, closes the worker's connection and stops the thread."""
+        if self.thread.isFinished():
+            return
+        self.closeRequested.emit()
+        self.thread.wait()